@@ -15,11 +15,13 @@ from .poly import *
 from .degRad import dsin,dcos,dtan
 from .vec import drec,drec3d,dpol,dpol3d,rec3d,pol3d,v3d
 from .matrix import Mat,AugMat
-from .geometry import line,plane
-from .regression import LinReg,QuadReg,CubReg,ExpReg,LogReg,Reg,bestFit,PolyReg
+from .geometry import line,plane,lineCompArr,lineCompTiles,planeIntersecArr,planeIntersecTiles,linePlaneArr,linePlaneTiles
+from .spatial import SpatialIndex
+from .regression import LinReg,QuadReg,CubReg,ExpReg,LogReg,PowReg,Reg,bestFit,PolyReg,batchFit,MultiReg,NLReg,ExpNLReg,PowNLReg,bootstrap,crossVal
+from .interp import Interp
 from .combinatorics import binomial,perm,comb
 from .distribution import DiscreteDistribution,UniformDistribution,BinomialDistribution,GeometricDistribution,HypergeometricDistribution,JointDiscreteDistribution
-from .contDistribution import ContinuousDistribution,ContinuousUniformDistribution,NormalDistribution,pZ,DefaultND,x,oo,Zp,binomialZ
+from .contDistribution import ContinuousDistribution,ContinuousUniformDistribution,NormalDistribution,pZ,DefaultND,x,oo,Zp,binomialZ,TpApprox
 from .customOp import p
 from .dataAnalysis import *
 from .nsolve import *
@@ -1,5 +1,5 @@
 from math import hypot
-from typing import Literal, overload
+from typing import Iterator, Literal, overload
 
 import numpy as np
 from numpy import dot
@@ -7,6 +7,7 @@ from numpy.linalg import det
 from numpy.linalg import solve as asolve
 
 from .floatCalc import nearZero
+from .typedef import NDArray
 from .vec import v3d
 
 
@@ -15,6 +16,12 @@ class line:
     a: v3d #Anchor
     d: v3d #Direction
 
+    #Pair kinds returned by lineCompArr
+    SKEW = 0
+    INTERSECT = 1
+    PARALLEL = 2
+    SAMELINE = 3
+
     def __repr__(self):
         return f'p:{self.a} d:{self.d}'
 
@@ -160,6 +167,8 @@ class line:
         Returns:
             v3d: Point of intersection
         print Parallel, Same Line, or Skewed
+
+        See lineCompArr for comparing many lines at once.
         """
 
         if np.allclose(self.d.rec3d(), a.d.rec3d())or np.allclose(self.d.__neg__().rec3d(),a.d.rec3d()):#Check direction for parallel or same line
@@ -213,11 +222,131 @@ class line:
             return
 
 
+def _lineArr(l: list[line] | tuple[NDArray, NDArray]) -> tuple[NDArray, NDArray]:
+    """Anchors and unit directions of lines as (n,3) arrays FOR INTERNAL USE ONLY"""
+    if isinstance(l, tuple):
+        a = np.asarray(l[0], dtype=np.float64).reshape(-1, 3)
+        d = np.asarray(l[1], dtype=np.float64).reshape(-1, 3)
+    else:
+        a = np.array([i.a.rec3d() for i in l], dtype=np.float64).reshape(-1, 3)
+        d = np.array([i.d.rec3d() for i in l], dtype=np.float64).reshape(-1, 3)
+    nd = np.linalg.norm(d, axis=1, keepdims=True)
+    if (nd == 0).any():
+        raise ValueError("Line directions must be non-zero")
+    return a, d/nd
+
+
+def lineCompTiles(a: list[line] | tuple[NDArray, NDArray], b: list[line] | tuple[NDArray, NDArray], points: bool = True, tile: int = 512, err: float = 1e-9) -> Iterator[tuple[slice, slice, NDArray, NDArray, NDArray | None, NDArray | None]]:
+    """Compare every line of a with every line of b, one tile of pairs at a time
+
+    Memory use is bounded by the tile size, so arbitrarily large sets can be
+    streamed through without holding the full pair arrays.
+
+    Args:
+        a (list[line] | tuple[NDArray, NDArray]): Lines or (anchors, directions) arrays of shape (n,3)
+        b (list[line] | tuple[NDArray, NDArray]): Lines or (anchors, directions) arrays of shape (m,3)
+        points (bool, optional): Also compute the closest points. Defaults to True.
+        tile (int, optional): Number of lines per tile side. Defaults to 512.
+        err (float, optional): Tolerance for parallel and touching tests. Defaults to 1e-9.
+
+    Yields:
+        tuple[slice, slice, NDArray, NDArray, NDArray | None, NDArray | None]: (rows of a, rows of b, kind, dist, p, q)
+            kind: line.SKEW, line.INTERSECT, line.PARALLEL or line.SAMELINE per pair
+            dist: Closest approach distance per pair
+            p: Closest point on the line of a (the intersection point if kind is line.INTERSECT)
+            q: Closest point on the line of b
+            p and q are None when points is False
+
+    Raises:
+        ValueError: If a direction is zero.
+    """
+    a1, d1 = _lineArr(a)
+    a2, d2 = _lineArr(b)
+    m1 = np.cross(a1, d1) #Moments, turn the triple products into matmuls
+    m2 = np.cross(a2, d2)
+    ad1 = np.einsum('ij,ij->i', a1, d1)
+    ad2 = np.einsum('ij,ij->i', a2, d2)
+    for i in range(0, len(a1), tile):
+        si = slice(i, i+tile)
+        ta, td = a1[si], d1[si]
+        for j in range(0, len(a2), tile):
+            sj = slice(j, j+tile)
+            ua, ud = a2[sj], d2[sj]
+            #Minimise |w + t*d1 - s*d2| with w = a1-a2 and unit directions
+            c = td@ud.T
+            dw = ad1[si, None]-td@ua.T
+            ew = ta@ud.T-ad2[None, sj]
+            den = 1-c*c
+            par = den < err
+            safe = np.where(par, 1, den)
+            t = np.where(par, 0, (c*ew-dw)/safe)
+            s = np.where(par, ew, (ew-c*dw)/safe)
+            dist = np.abs(m1[si]@ud.T+td@m2[sj].T)/np.sqrt(safe) #|w.(d1xd2)|/|d1xd2|
+            if par.any():
+                pi, pj = np.nonzero(par)
+                dist[pi, pj] = np.linalg.norm(np.cross(ta[pi]-ua[pj], ud[pj]), axis=-1)
+            p = ta[:, None, :]+t[..., None]*td[:, None, :] if points else None
+            q = ua[None, :, :]+s[..., None]*ud[None, :, :] if points else None
+            near = dist < err
+            kind = np.full(c.shape, line.SKEW, dtype=np.int8)
+            kind[near] = line.INTERSECT
+            kind[par] = line.PARALLEL
+            kind[par & near] = line.SAMELINE
+            yield si, sj, kind, dist, p, q
+
+
+def lineCompArr(a: list[line] | tuple[NDArray, NDArray], b: list[line] | tuple[NDArray, NDArray], points: bool = True, tile: int = 512, err: float = 1e-9) -> tuple[NDArray, NDArray, NDArray | None, NDArray | None]:
+    """Compare every line of a with every line of b
+
+    Vectorized version of line.comp that returns results instead of printing.
+
+    Args:
+        a (list[line] | tuple[NDArray, NDArray]): Lines or (anchors, directions) arrays of shape (n,3)
+        b (list[line] | tuple[NDArray, NDArray]): Lines or (anchors, directions) arrays of shape (m,3)
+        points (bool, optional): Also return the closest points. Defaults to True.
+            (n,m,3) arrays get large, turn off when only kinds and distances are needed.
+        tile (int, optional): Number of lines per tile side. Defaults to 512.
+        err (float, optional): Tolerance for parallel and touching tests. Defaults to 1e-9.
+
+    Returns:
+        tuple[NDArray, NDArray, NDArray | None, NDArray | None]: (kind, dist, p, q) see lineCompTiles
+
+    Raises:
+        ValueError: If a direction is zero.
+
+    Examples:
+        >>> kind,dist,p,q = lineCompArr([line([0,0,0],[1,0,0])],[line([0,1,0],[0,1,0]),line([0,1,1],[1,0,0])])
+        >>> kind
+        array([[1, 2]], dtype=int8)
+        >>> np.allclose(p[0,0],[0,0,0])
+        True
+    """
+    a = _lineArr(a)
+    b = _lineArr(b)
+    n, m = len(a[0]), len(b[0])
+    kind = np.empty((n, m), dtype=np.int8)
+    dist = np.empty((n, m), dtype=np.float64)
+    p = np.empty((n, m, 3), dtype=np.float64) if points else None
+    q = np.empty((n, m, 3), dtype=np.float64) if points else None
+    for si, sj, k, d, tp, tq in lineCompTiles(a, b, points, tile, err):
+        kind[si, sj] = k
+        dist[si, sj] = d
+        if points:
+            p[si, sj] = tp  # type: ignore
+            q[si, sj] = tq  # type: ignore
+    return kind, dist, p, q
+
+
 class plane:
     """Plane Class"""
     a: v3d #Anchor
     n: v3d #Normal
 
+    #Pair kinds returned by planeIntersecArr and linePlaneArr
+    INTERSECT = 1
+    PARALLEL = 2
+    COINCIDENT = 3
+
     def __repr__(self):
         return f'p:{self.a} n:{self.n}'
 
@@ -307,6 +436,73 @@ class plane:
         """
         return plane(a, v3d(b-a)@v3d(c-a))
 
+    @staticmethod
+    def fit(pts: NDArray | list[v3d], mode: Literal["lsq","ransac"] = "lsq", err: float | None = None, conf: float = 0.99, batch: int = 256, maxIter: int = 10000, sample: int = 65536, seed: int | None = None) -> tuple['plane', NDArray]:
+        """Fit a plane to a point cloud
+
+        lsq: Total least squares plane through the centroid (smallest eigenvector of the scatter matrix)
+        ransac: Candidate planes from random point triples, scored batch by batch against a random sample,
+            then refit by lsq on the inliers of the best candidate over every point.
+            Stops once conf probability of having drawn an all inlier triple is reached.
+
+        Args:
+            pts (NDArray | list[v3d]): (n,3) points
+            mode (Literal["lsq","ransac"], optional): Fitting mode. Defaults to "lsq".
+            err (float | None, optional): Inlier distance. Defaults to None.
+                Required for ransac, lsq marks every point as inlier when None.
+            conf (float, optional): ransac confidence. Defaults to 0.99.
+            batch (int, optional): ransac candidates scored per batch. Defaults to 256.
+            maxIter (int, optional): ransac candidate limit. Defaults to 10000.
+            sample (int, optional): Points used to score candidates. Defaults to 65536.
+            seed (int | None, optional): ransac random seed. Defaults to None.
+
+        Returns:
+            tuple[plane, NDArray]: Plane and boolean inlier mask
+
+        Raises:
+            ValueError: If there are fewer than 3 points or ransac is run without err
+        """
+        p = np.array([i.rec3d() for i in pts], dtype=np.float64) if isinstance(pts, list) else np.asarray(pts, dtype=np.float64).reshape(-1, 3)
+        if len(p) < 3:
+            raise ValueError("At least 3 points are needed")
+        if mode == "ransac":
+            if err is None:
+                raise ValueError("ransac needs an inlier distance err")
+            rng = np.random.default_rng(seed)
+            s = p if len(p) <= sample else p[rng.choice(len(p), sample, replace=False)]
+            best, bestN, need, done = -1, np.zeros(3), maxIter, 0
+            bestE = 0.
+            chunk = max(1, (1 << 22)//batch) #Sample rows scored at once, caps the score matrix at 4M entries
+            while done < min(need, maxIter):
+                idx = rng.integers(0, len(p), (batch, 3))
+                n = np.cross(p[idx[:, 1]]-p[idx[:, 0]], p[idx[:, 2]]-p[idx[:, 0]])
+                m = np.linalg.norm(n, axis=1)
+                n = n/np.where(m == 0, 1, m)[:, None]
+                e = -np.einsum('ij,ij->i', n, p[idx[:, 0]])
+                score = sum((np.abs(s[i:i+chunk]@n.T+e) <= err).sum(axis=0) for i in range(0, len(s), chunk))
+                score[m == 0] = -1 #Collinear triples
+                k = int(np.argmax(score))
+                if score[k] > best:
+                    best, bestN, bestE = int(score[k]), n[k], float(e[k])
+                    w = best/len(s)
+                    if w >= 1:
+                        need = done+batch
+                    else:
+                        with np.errstate(divide="ignore"):
+                            r = np.log1p(-conf)/np.log1p(-w**3) #1-w^3 rounds to 1 for small w
+                        need = min(int(np.ceil(r)), maxIter) if np.isfinite(r) else maxIter
+                done += batch
+            mask = np.abs(p@bestN+bestE) <= err
+            if mask.sum() < 3:
+                return plane(list(p[mask].mean(axis=0)) if mask.any() else list(p[0]), list(bestN)), mask
+            fit, _ = plane.fit(p[mask])
+            return fit, np.abs(p@np.array(fit.n.rec3d())+fit.eqd) <= err
+        c = p.mean(axis=0)
+        q = p-c
+        n = np.linalg.eigh(q.T@q)[1][:, 0]
+        mask = np.ones(len(p), dtype=bool) if err is None else np.abs(q@n) <= err
+        return plane(list(c), list(n)), mask
+
     def dist(self, b: v3d):
         """Distance from point to plane
         
@@ -328,6 +524,8 @@ class plane:
             float: Distance
             
         Print "Not Parallel" if not parallel
+
+        See planeIntersecArr for many planes at once.
         """
         if np.allclose(self.n.rec3d(), b.n.rec3d()):
             return (self.eqd-b.eqd)/hypot(b.n.x, b.n.y, b.n.z)
@@ -345,6 +543,8 @@ class plane:
             line: Intersection line
 
         Print "Parallel" if parallel
+
+        See planeIntersecArr and linePlaneArr for many planes at once.
         """
 
         if np.allclose(self.n.rec3d(), b.n.rec3d()):
@@ -382,3 +582,189 @@ class plane:
             return line([0,y,z],self.n@b.n)
 
         else:print("error")
+
+
+
+def _planeArr(p: list[plane] | tuple[NDArray, NDArray]) -> tuple[NDArray, NDArray]:
+    """Unit normals (n,3) and offsets (n,) with n.x+e=0 of planes FOR INTERNAL USE ONLY"""
+    if isinstance(p, tuple):
+        a = np.asarray(p[0], dtype=np.float64).reshape(-1, 3)
+        n = np.asarray(p[1], dtype=np.float64).reshape(-1, 3)
+    else:
+        a = np.array([i.a.rec3d() for i in p], dtype=np.float64).reshape(-1, 3)
+        n = np.array([i.n.rec3d() for i in p], dtype=np.float64).reshape(-1, 3)
+    nn = np.linalg.norm(n, axis=1, keepdims=True)
+    if (nn == 0).any():
+        raise ValueError("Plane normals must be non-zero")
+    n = n/nn
+    return n, -np.einsum('ij,ij->i', n, a)
+
+
+def planeIntersecTiles(a: list[plane] | tuple[NDArray, NDArray], b: list[plane] | tuple[NDArray, NDArray], tile: int = 512, err: float = 1e-9) -> Iterator[tuple[slice, slice, NDArray, NDArray, NDArray, NDArray]]:
+    """Intersect every plane of a with every plane of b, one tile of pairs at a time
+
+    Each tile covers up to tile planes of a against tile planes of b, so p and d are at most (tile,tile,3).
+
+    Args:
+        a (list[plane] | tuple[NDArray, NDArray]): Planes or (anchors, normals) arrays of shape (n,3)
+        b (list[plane] | tuple[NDArray, NDArray]): Planes or (anchors, normals) arrays of shape (m,3)
+        tile (int, optional): Number of planes per tile side. Defaults to 512.
+        err (float, optional): Tolerance for parallel and coincident tests. Defaults to 1e-9.
+
+    Yields:
+        tuple[slice, slice, NDArray, NDArray, NDArray, NDArray]: (rows of a, rows of b, kind, p, d, dist)
+            kind: plane.INTERSECT, plane.PARALLEL or plane.COINCIDENT per pair
+            p: Point of the intersection line closest to the origin, nan if parallel
+            d: Unit direction of the intersection line, nan if parallel
+            dist: Signed distance from plane of a to plane of b along the normal of a, 0 if intersecting
+
+    Raises:
+        ValueError: If a normal is zero.
+    """
+    n1, e1 = _planeArr(a)
+    n2, e2 = _planeArr(b)
+    for i in range(0, len(n1), tile):
+        si = slice(i, i+tile)
+        tn, te = n1[si], e1[si]
+        for j in range(0, len(n2), tile):
+            sj = slice(j, j+tile)
+            un, ue = n2[sj], e2[sj]
+            c = tn@un.T
+            u = np.cross(tn[:, None, :], un[None, :, :])
+            uu = np.einsum('ijk,ijk->ij', u, u)
+            par = uu < err
+            safe = np.where(par, 1, uu)
+            #Point closest to origin: ((h1*n2-h2*n1) x u)/|u|^2 with n.x = h
+            h = -te[:, None, None]*un[None, :, :]+ue[None, :, None]*tn[:, None, :]
+            p = np.cross(h, u)/safe[..., None]
+            d = u/np.sqrt(safe)[..., None]
+            p[par] = np.nan
+            d[par] = np.nan
+            dist = np.where(par, te[:, None]-np.sign(c)*ue[None, :], 0.)
+            kind = np.full(c.shape, plane.INTERSECT, dtype=np.int8)
+            kind[par] = plane.PARALLEL
+            kind[par & (np.abs(dist) < err)] = plane.COINCIDENT
+            yield si, sj, kind, p, d, dist
+
+
+def planeIntersecArr(a: list[plane] | tuple[NDArray, NDArray], b: list[plane] | tuple[NDArray, NDArray], tile: int = 512, err: float = 1e-9) -> tuple[NDArray, NDArray, NDArray, NDArray]:
+    """Intersect every plane of a with every plane of b
+
+    Vectorized version of plane.intersec and plane.d2p.
+
+    Args:
+        a (list[plane] | tuple[NDArray, NDArray]): Planes or (anchors, normals) arrays of shape (n,3)
+        b (list[plane] | tuple[NDArray, NDArray]): Planes or (anchors, normals) arrays of shape (m,3)
+        tile (int, optional): Number of planes per tile side. Defaults to 512.
+        err (float, optional): Tolerance for parallel and coincident tests. Defaults to 1e-9.
+
+    Returns:
+        tuple[NDArray, NDArray, NDArray, NDArray]: (kind, p, d, dist) of shapes (n,m), (n,m,3), (n,m,3), (n,m)
+            see planeIntersecTiles, which streams them when the (n,m,3) arrays get too large
+
+    Raises:
+        ValueError: If a normal is zero.
+
+    Examples:
+        >>> kind,p,d,dist = planeIntersecArr([plane([0,0,0],[0,0,1])],[plane([0,0,0],[1,0,0]),plane([0,0,2],[0,0,-1])])
+        >>> kind
+        array([[1, 2]], dtype=int8)
+        >>> dist
+        array([[0., 2.]])
+    """
+    a = _planeArr(a)
+    b = _planeArr(b)
+    #Back to (anchors, normals), the anchor -e*n lies on n.x+e=0
+    a = (-a[1][:, None]*a[0], a[0])
+    b = (-b[1][:, None]*b[0], b[0])
+    n, m = len(a[0]), len(b[0])
+    kind = np.empty((n, m), dtype=np.int8)
+    p = np.empty((n, m, 3), dtype=np.float64)
+    d = np.empty((n, m, 3), dtype=np.float64)
+    dist = np.empty((n, m), dtype=np.float64)
+    for si, sj, tk, tp, td, tdist in planeIntersecTiles(a, b, tile, err):
+        kind[si, sj] = tk
+        p[si, sj] = tp
+        d[si, sj] = td
+        dist[si, sj] = tdist
+    return kind, p, d, dist
+
+
+def linePlaneTiles(l: list[line] | tuple[NDArray, NDArray], p: list[plane] | tuple[NDArray, NDArray], tile: int = 512, err: float = 1e-9) -> Iterator[tuple[slice, slice, NDArray, NDArray, NDArray, NDArray]]:
+    """Intersect every line of l with every plane of p, one tile of pairs at a time
+
+    Each tile covers up to tile lines against tile planes, x is at most (tile,tile,3).
+
+    Args:
+        l (list[line] | tuple[NDArray, NDArray]): Lines or (anchors, directions) arrays of shape (n,3)
+        p (list[plane] | tuple[NDArray, NDArray]): Planes or (anchors, normals) arrays of shape (m,3)
+        tile (int, optional): Number of lines and planes per tile side. Defaults to 512.
+        err (float, optional): Tolerance for parallel and coincident tests. Defaults to 1e-9.
+
+    Yields:
+        tuple[slice, slice, NDArray, NDArray, NDArray, NDArray]: (rows of l, rows of p, kind, t, x, dist)
+            kind: plane.INTERSECT, plane.PARALLEL or plane.COINCIDENT (line lies on plane) per pair
+            t: Line parameter of the intersection, nan if parallel
+            x: Intersection point, nan if parallel
+            dist: Signed distance from plane to line along the normal, 0 if intersecting
+
+    Raises:
+        ValueError: If a direction or normal is zero.
+    """
+    a, d = _lineArr(l)
+    n, e = _planeArr(p)
+    for i in range(0, len(a), tile):
+        si = slice(i, i+tile)
+        ta, td = a[si], d[si]
+        for j in range(0, len(n), tile):
+            sj = slice(j, j+tile)
+            un, ue = n[sj], e[sj]
+            nd = td@un.T
+            sd = ta@un.T+ue[None, :]
+            par = np.abs(nd) < err
+            t = np.where(par, np.nan, -sd/np.where(par, 1, nd))
+            x = ta[:, None, :]+t[..., None]*td[:, None, :]
+            dist = np.where(par, sd, 0.)
+            kind = np.full(nd.shape, plane.INTERSECT, dtype=np.int8)
+            kind[par] = plane.PARALLEL
+            kind[par & (np.abs(sd) < err)] = plane.COINCIDENT
+            yield si, sj, kind, t, x, dist
+
+
+def linePlaneArr(l: list[line] | tuple[NDArray, NDArray], p: list[plane] | tuple[NDArray, NDArray], tile: int = 512, err: float = 1e-9) -> tuple[NDArray, NDArray, NDArray, NDArray]:
+    """Intersect every line of l with every plane of p
+
+    Args:
+        l (list[line] | tuple[NDArray, NDArray]): Lines or (anchors, directions) arrays of shape (n,3)
+        p (list[plane] | tuple[NDArray, NDArray]): Planes or (anchors, normals) arrays of shape (m,3)
+        tile (int, optional): Number of lines and planes per tile side. Defaults to 512.
+        err (float, optional): Tolerance for parallel and coincident tests. Defaults to 1e-9.
+
+    Returns:
+        tuple[NDArray, NDArray, NDArray, NDArray]: (kind, t, x, dist) of shapes (n,m), (n,m), (n,m,3), (n,m)
+            see linePlaneTiles, which streams them when the (n,m,3) array gets too large
+
+    Raises:
+        ValueError: If a direction or normal is zero.
+
+    Examples:
+        >>> kind,t,x,dist = linePlaneArr([line([0,0,5],[0,0,1])],[plane([0,0,1],[0,0,1]),plane([1,0,0],[1,0,0])])
+        >>> kind
+        array([[1, 2]], dtype=int8)
+        >>> t
+        array([[-4., nan]])
+    """
+    l = _lineArr(l)
+    p = _planeArr(p)
+    p = (-p[1][:, None]*p[0], p[0])
+    n, m = len(l[0]), len(p[0])
+    kind = np.empty((n, m), dtype=np.int8)
+    t = np.empty((n, m), dtype=np.float64)
+    x = np.empty((n, m, 3), dtype=np.float64)
+    dist = np.empty((n, m), dtype=np.float64)
+    for si, sj, tk, tt, tx, tdist in linePlaneTiles(l, p, tile, err):
+        kind[si, sj] = tk
+        t[si, sj] = tt
+        x[si, sj] = tx
+        dist[si, sj] = tdist
+    return kind, t, x, dist
@@ -0,0 +1,141 @@
+from bisect import bisect_right
+from typing import Literal, Union
+from .typedef import number,NDArray
+from .regression import Reg
+import numpy as np
+
+def _tridiag(a:list[float],b:list[float],c:list[float],d:list[float]) -> list[float]:
+    """Solve a tridiagonal system in O(n) (Thomas algorithm) FOR INTERNAL USE ONLY
+
+    a is the subdiagonal (a[0] unused), b the diagonal, c the superdiagonal (c[-1] unused), d the right hand side."""
+    n=len(d)
+    c=c[:]
+    d=d[:]
+    c[0]/=b[0]
+    d[0]/=b[0]
+    for i in range(1,n):
+        m=b[i]-a[i]*c[i-1]
+        c[i]/=m
+        d[i]=(d[i]-a[i]*d[i-1])/m
+    for i in range(n-2,-1,-1):
+        d[i]-=c[i]*d[i+1]
+    return d
+
+class Interp:
+    """Interpolation through tabulated points.
+
+    Piecewise cubic (natural or clamped spline) or piecewise linear, stored as the coefficients
+    of a+bt+ct^2+dt^3 with t=x-x[i] on every interval. Queries outside the table extrapolate the end pieces."""
+
+    def __init__(self,x:Union[list[number],NDArray,Reg],fx:list[number]|NDArray|None=None,kind:Literal["natural","clamped","linear"]="natural",slopes:tuple[number,number]=(0,0)) -> None:
+        """Build an interpolant in O(n).
+
+        Args:
+            x (list[number]|NDArray|Reg): The x values, in any order.
+                If a Reg object is passed, the x and fx values of the Reg object will be used.
+            fx (list[number]|NDArray|None): The f(x) values.
+            kind (Literal["natural","clamped","linear"], optional): The interpolant. Defaults to "natural".
+                natural has zero second derivative at the ends, clamped has the given end slopes.
+            slopes (tuple[number,number], optional): f'(x) at the first and last x for clamped. Defaults to (0,0).
+
+        Raises:
+            ValueError: If the lengths differ, there are fewer than 2 points or an x is repeated.
+        """
+        if isinstance(x,Reg):
+            x,fx=x.x,x.fx
+        x=np.asarray(x,dtype=np.float64)
+        fx=np.asarray(fx,dtype=np.float64)
+        if len(x)!=len(fx) or len(x)<2:
+            raise ValueError("Need at least 2 points with one f(x) each")
+        o=np.argsort(x,kind="stable")
+        x,fx=x[o],fx[o]
+        h=np.diff(x)
+        if not (h>0).all():
+            raise ValueError("x values must be distinct")
+        self.x=x
+        self.fx=fx
+        self.kind=kind
+        s=np.diff(fx)/h
+        if kind=="linear":
+            M=np.zeros(len(x))
+        else:
+            a=[0.]+h.tolist()
+            b=[1.]+(2*(h[:-1]+h[1:])).tolist()+[1.]
+            c=h.tolist()+[0.]
+            d=[0.]+(6*np.diff(s)).tolist()+[0.]
+            if kind=="clamped":
+                b[0],b[-1]=2*h[0],2*h[-1]
+                d[0],d[-1]=6*(s[0]-slopes[0]),6*(slopes[1]-s[-1])
+            else:
+                c[0]=a[-1]=0.
+            M=np.array(_tridiag(a,b,c,d))
+        self._coef=np.stack([fx[:-1],s-h*(2*M[:-1]+M[1:])/6,M[:-1]/2,(M[1:]-M[:-1])/(6*h)],axis=-1)
+        self._rows=self._coef.tolist() #Python floats for scalar queries
+        self._t=x.tolist()
+        self._last=0 #Interval of the last scalar query, for monotone streams
+
+    def __repr__(self) -> str:
+        return f"{self.kind} interpolant through {len(self.x)} points on [{self.x[0]},{self.x[-1]}]"
+
+    def index(self,x:number|list[number]|NDArray) -> int|NDArray:
+        """Interval of x, i such that x[i]<=x<x[i+1] clipped to the table.
+
+        Scalar queries first try the interval of the previous query and its neighbour,
+        so a monotone stream of queries costs O(1) each instead of a search.
+
+        Args:
+            x (number|list[number]|NDArray): The x value(s).
+
+        Returns:
+            int|NDArray: The interval index(es).
+        """
+        if np.ndim(x):
+            return np.clip(np.searchsorted(self.x,x,side="right")-1,0,len(self.x)-2)
+        t=self._t
+        i=self._last
+        if t[i]<=x:
+            if i+2>=len(t) or x<t[i+1]:
+                return i
+            if i+3>=len(t) or x<t[i+2]:
+                self._last=i+1
+                return i+1
+        elif i==0:
+            return 0
+        self._last=i=min(max(bisect_right(t,x)-1,0),len(t)-2)
+        return i
+
+    def f(self,x:number|list[number]|NDArray) -> number|NDArray:
+        """Interpolated f(x).
+
+        Args:
+            x (number|list[number]|NDArray): The x value(s).
+
+        Returns:
+            number|NDArray: The f(x) value(s).
+        """
+        i=self.index(x)
+        if np.ndim(x):
+            u=np.asarray(x,dtype=np.float64)-self.x[i]
+            a,b,c,d=self._coef[i].T
+        else:
+            u=x-self._t[i]
+            a,b,c,d=self._rows[i]
+        return a+u*(b+u*(c+u*d))
+
+    def df(self,x:number|list[number]|NDArray) -> number|NDArray:
+        """Derivative f'(x) of the interpolant.
+
+        Args:
+            x (number|list[number]|NDArray): The x value(s).
+
+        Returns:
+            number|NDArray: The f'(x) value(s).
+        """
+        i=self.index(x)
+        if np.ndim(x):
+            u=np.asarray(x,dtype=np.float64)-self.x[i]
+            _,b,c,d=self._coef[i].T
+        else:
+            u=x-self._t[i]
+            _,b,c,d=self._rows[i]
+        return b+u*(2*c+3*u*d)
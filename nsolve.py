@@ -1,34 +1,192 @@
-from .typedef import number
-from typing import Callable, Concatenate
+from .typedef import number,NDArray
+from .matrix import Mat
+from typing import Callable, Concatenate, Literal
 from sys import stderr
+import numpy as np
 
-def invFuncSolve(func:Callable[[number],number],y:number,start:number=1,err:number=1e-6,debug:bool = False) -> number:
+def invFuncSolve(func:Callable[[number],number],y:number,start:number=1,err:number=1e-6,debug:bool = False,dfunc:Callable[[number],number]|None=None,bracket:tuple[number,number]|None=None,maxIter:int=100) -> number:
     """
-    Solve for the inverse of a function using Newton's method.
+    Solve for the inverse of a function, see rootSolve.
 
     Args:
         func (Callable[[number],number]): Function to solve for the inverse of
         y (number): Value to solve for
         start (number, optional): Initial guess. Defaults to 1.
-        err (number, optional): Error tolerance and step size. Defaults to 1e-6.
-        debug (bool, optional): Print debug information. Defaults to False.
+        err (number, optional): Error tolerance on func(x)-y. Defaults to 1e-6.
+        debug (bool, optional): Print every evaluation. Defaults to False.
+        dfunc (Callable[[number],number]|None, optional): Derivative of func. Defaults to None.
+        bracket (tuple[number,number]|None, optional): Interval where func(x)-y changes sign. Defaults to None.
+        maxIter (int, optional): Maximum number of iterations. Defaults to 100.
             
     Returns:
         number: x such that func(x) = y
     """
-    x = start
-    while abs(func(x)-y)>err:
-        if debug:
-            print("x:", x,file=stderr)
-            print("f(x):", func(x),file=stderr)
-            print("(f(x)-y):", func(x)-y,file=stderr)
-            print("f(x+err):", func(x+err),file=stderr)
-            print("(f(x+err)-f(x)):", func(x+err)-func(x),file=stderr)
-            print("(f(x+err)-f(x))/err:", (func(x+err)-func(x))/err,file=stderr)
-            print("Delta x:", -(func(x)-y)/((func(x+err)-func(x))/err),file=stderr)
-            print("",file=stderr)
-        x = x - (func(x)-y)/((func(x+err)-func(x))/err)
-    return x
+    if debug:
+        f=func
+        def func(x):
+            v=f(x)
+            print("x:", x, "f(x):", v, "(f(x)-y):", v-y,file=stderr)
+            return v
+    return rootSolve(func,y,start,dfunc,bracket,err,maxIter)[0]
+
+def rootSolve(func:Callable[[number],number],y:number=0,start:number=1,dfunc:Callable[[number],number]|None=None,bracket:tuple[number,number]|None=None,err:number=1e-6,maxIter:int=100) -> tuple[number,int]:
+    """
+    Solve func(x) = y with as few evaluations as possible.
+
+    Newton's method with dfunc, otherwise the secant method (one evaluation per iteration).
+    Once two points with func(x)-y of opposite signs are known, either given as bracket or met
+    along the way, Brent's method (inverse quadratic interpolation safeguarded by bisection) finishes.
+
+    Args:
+        func (Callable[[number],number]): Function to solve
+        y (number, optional): Value to solve for. Defaults to 0.
+        start (number, optional): Initial guess, unused with bracket. Defaults to 1.
+        dfunc (Callable[[number],number]|None, optional): Derivative of func. Defaults to None.
+        bracket (tuple[number,number]|None, optional): Interval where func(x)-y changes sign. Defaults to None.
+        err (number, optional): Error tolerance on func(x)-y. Defaults to 1e-6.
+        maxIter (int, optional): Maximum number of iterations. Defaults to 100.
+
+    Returns:
+        tuple[number,int]: x, number of func and dfunc evaluations
+
+    Raises:
+        ValueError: If the bracket does not change sign, the slope vanishes or maxIter is reached.
+    """
+    n = 0
+    def g(x):
+        nonlocal n
+        n += 1
+        return func(x)-y
+    if bracket is not None:
+        a,b = bracket
+        fa,fb = g(a),g(b)
+        if fa*fb > 0:
+            raise ValueError("func(x)-y has the same sign at both ends of the bracket")
+        return _brent(g,a,b,fa,fb,err,maxIter),n
+    x0 = start
+    f0 = g(x0)
+    if dfunc is None:
+        x1 = x0+1e-4*max(abs(x0),1)
+        f1 = g(x1)
+    else:
+        x1,f1 = x0,f0
+    for i in range(maxIter):
+        if abs(f1) <= err:
+            return x1,n
+        if f0*f1 < 0:
+            return _brent(g,x0,x1,f0,f1,err,maxIter),n
+        if dfunc is None:
+            d = (f1-f0)/(x1-x0)
+        else:
+            d = dfunc(x1)
+            n += 1
+        if d == 0:
+            raise ValueError(f"Zero slope at x={x1}")
+        x0,f0 = x1,f1
+        x1 = x1-f1/d
+        f1 = g(x1)
+    if abs(f1) <= err:
+        return x1,n
+    raise ValueError(f"No convergence in {maxIter} iterations")
+
+def invFuncSolveArr(func:Callable[[NDArray],NDArray],y:list[number]|NDArray,bracket:tuple[number|NDArray,number|NDArray]|None=None,start:number|NDArray=1,err:number=1e-6,maxIter:int=100) -> NDArray:
+    """
+    Solve for the inverse of a function at many values at once.
+
+    Every value has its own bracket, found by expanding from start and start+1 when not given,
+    then refined with the Illinois method (regula falsi that halves the stale end).
+    func is called on arrays of the values still being solved, so values that have converged cost nothing.
+
+    Args:
+        func (Callable[[NDArray],NDArray]): Elementwise function (numpy ufunc style) to solve for the inverse of
+        y (list[number]|NDArray): Values to solve for
+        bracket (tuple[number|NDArray,number|NDArray]|None, optional): Intervals where func(x)-y changes sign,
+            scalars or one per value. Defaults to None.
+        start (number|NDArray, optional): Initial guess when no bracket is given. Defaults to 1.
+        err (number, optional): Error tolerance on func(x)-y. Defaults to 1e-6.
+        maxIter (int, optional): Maximum number of iterations. Defaults to 100.
+
+    Returns:
+        NDArray: x such that func(x) = y, nan where no sign change was found
+    """
+    y = np.asarray(y,dtype=np.float64)
+    shape = y.shape
+    y = y.ravel()
+    if bracket is None:
+        a = np.broadcast_to(np.asarray(start,dtype=np.float64),shape).ravel().copy()
+        b = a+1
+    else:
+        a = np.broadcast_to(np.asarray(bracket[0],dtype=np.float64),shape).ravel().copy()
+        b = np.broadcast_to(np.asarray(bracket[1],dtype=np.float64),shape).ravel().copy()
+    fa = func(a)-y
+    fb = func(b)-y
+    act = np.flatnonzero(fa*fb > 0)
+    for i in range(maxIter if bracket is None else 0):
+        if not len(act):
+            break
+        low = np.abs(fa[act]) < np.abs(fb[act])
+        ia,ib = act[low],act[~low]
+        a[ia] += 1.6*(a[ia]-b[ia])
+        fa[ia] = func(a[ia])-y[ia]
+        b[ib] += 1.6*(b[ib]-a[ib])
+        fb[ib] = func(b[ib])-y[ib]
+        act = act[fa[act]*fb[act] > 0]
+    x = np.where(np.abs(fa) < np.abs(fb),a,b)
+    x[act] = np.nan
+    act = np.flatnonzero((fa*fb <= 0) & (np.minimum(np.abs(fa),np.abs(fb)) > err))
+    for i in range(maxIter):
+        if not len(act):
+            break
+        A,B,FA,FB = a[act],b[act],fa[act],fb[act]
+        X = B-FB*(B-A)/(FB-FA)
+        X = np.where(np.isfinite(X),X,(A+B)/2)
+        FX = func(X)-y[act]
+        flip = FX*FB < 0
+        a[act] = np.where(flip,B,A)
+        fa[act] = np.where(flip,FB,FA/2)
+        b[act],fb[act] = X,FX
+        x[act] = X
+        act = act[(np.abs(FX) > err) & (X != A) & (X != B)]
+    return x.reshape(shape)
+
+def _brent(g:Callable[[number],number],a:number,b:number,fa:number,fb:number,err:number,maxIter:int) -> number:
+    """Brent's method on a bracket with known g values FOR INTERNAL USE ONLY"""
+    c,fc = b,fb
+    d = e = b-a
+    for i in range(maxIter):
+        if fb*fc > 0:
+            c,fc = a,fa
+            d = e = b-a
+        if abs(fc) < abs(fb):
+            a,b,c = b,c,b
+            fa,fb,fc = fb,fc,fb
+        tol = 4.4e-16*abs(b)
+        xm = (c-b)/2
+        if abs(fb) <= err or abs(xm) <= tol:
+            return b
+        if abs(e) >= tol and abs(fa) > abs(fb):
+            s = fb/fa
+            if a == c:
+                p,q = 2*xm*s,1-s
+            else:
+                q,r = fa/fc,fb/fc
+                p = s*(2*xm*q*(q-r)-(b-a)*(r-1))
+                q = (q-1)*(r-1)*(s-1)
+            if p > 0:
+                q = -q
+            p = abs(p)
+            if 2*p < min(3*xm*q-abs(tol*q),abs(e*q)):
+                e,d = d,p/q
+            else:
+                d = e = xm
+        else:
+            d = e = xm
+        a,fa = b,fb
+        b += d if abs(d) > tol else (tol if xm > 0 else -tol)
+        fb = g(b)
+    if abs(fb) <= err:
+        return b
+    raise ValueError(f"No convergence in {maxIter} iterations")
 
 def numIntTrap(func:Callable[[number],number],a:number,b:number,n:int) -> number:
     """
@@ -42,6 +200,8 @@ def numIntTrap(func:Callable[[number],number],a:number,b:number,n:int) -> number
 
     Returns:
         number: Approximate integral of func from a to b
+
+    See numIntGK and numIntRomberg for integration to a tolerance
     """
     h = (b-a)/n
     s = 0.5*(func(a)+func(b))
@@ -49,9 +209,95 @@ def numIntTrap(func:Callable[[number],number],a:number,b:number,n:int) -> number
         s += func(a+i*h)
     return s*h
 
+_GKX = np.array([0.991455371120812639206854697526329,0.949107912342758524526189684047851,0.864864423359769072789712788640926,0.741531185599394439863864773280788,0.586087235467691130294144845693013,0.405845151377397166906606412076961,0.207784955007898467600689403773245])
+_GKX = np.concatenate([-_GKX,[0.],_GKX[::-1]]) #Kronrod nodes on [-1,1], the odd ones are the Gauss nodes
+_GKW = np.array([0.022935322010529224963732008058970,0.063092092629978553290700663189204,0.104790010322250183839876322541518,0.140653259715525918745189590510238,0.169004726639267902826583426598550,0.190350578064785409913256402421014,0.204432940075298892414161999234649])
+_GKW = np.concatenate([_GKW,[0.209482141084727828012999174891714],_GKW[::-1]])
+_GW = np.zeros(15)
+_GW[1::2] = [0.129484966168869693270611432679082,0.279705391489276667901467771423780,0.381830050505118944950369775488975,0.417959183673469387755102040816327,0.381830050505118944950369775488975,0.279705391489276667901467771423780,0.129484966168869693270611432679082]
+
+def numIntGK(func:Callable[[number],number],a:number,b:number,err:number=1e-10,rel:number=1e-10,vectorized:bool=False,maxIntervals:int=2000) -> tuple[number,number,int]:
+    """
+    Numerically integrate a function with adaptive Gauss-Kronrod 7/15 quadrature.
+
+    Every interval is integrated with the 15 point Kronrod rule, the embedded 7 point Gauss rule
+    gives its error estimate, and the intervals with more than their share of the tolerance are bisected
+    until the total error estimate is within max(err,rel*|integral|).
+
+    Args:
+        func (Callable[[number],number]): Function to integrate
+        a (number): Lower bound
+        b (number): Upper bound
+        err (number, optional): Absolute error tolerance. Defaults to 1e-10.
+        rel (number, optional): Relative error tolerance. Defaults to 1e-10.
+        vectorized (bool, optional): func takes and returns arrays (numpy ufunc style),
+            all the nodes of a refinement round are then passed in one call. Defaults to False.
+        maxIntervals (int, optional): Stop refining past this many intervals. Defaults to 2000.
+
+    Returns:
+        tuple[number,number,int]: Approximate integral of func from a to b, error estimate, number of evaluations
+    """
+    L = H = I = E = np.empty(0)
+    nl,nh = np.array([a],dtype=np.float64),np.array([b],dtype=np.float64)
+    n = 0
+    while True:
+        c,h = (nl+nh)/2,(nh-nl)/2
+        X = c[:,None]+h[:,None]*_GKX
+        F = func(X) if vectorized else np.array([func(t) for t in X.ravel().tolist()],dtype=np.float64).reshape(X.shape)
+        n += X.size
+        K = h*(F@_GKW)
+        L,H = np.concatenate([L,nl]),np.concatenate([H,nh])
+        I,E = np.concatenate([I,K]),np.concatenate([E,np.abs(K-h*(F@_GW))])
+        total,e = I.sum(),E.sum()
+        tol = max(err,rel*abs(total))
+        if e <= tol or len(I) >= maxIntervals:
+            return float(total),float(e),n
+        split = E > tol/len(E)
+        m = (L[split]+H[split])/2
+        nl,nh = np.concatenate([L[split],m]),np.concatenate([m,H[split]])
+        L,H,I,E = L[~split],H[~split],I[~split],E[~split]
+
+def numIntRomberg(func:Callable[[number],number],a:number,b:number,err:number=1e-10,rel:number=1e-10,vectorized:bool=False,maxLevel:int=20) -> tuple[number,number,int]:
+    """
+    Numerically integrate a function with Romberg's method.
+
+    The trapezoidal rule is refined by halving the step, evaluating only the new midpoints,
+    and the sequence is Richardson extrapolated until two diagonal entries agree within max(err,rel*|integral|).
+
+    Args:
+        func (Callable[[number],number]): Function to integrate
+        a (number): Lower bound
+        b (number): Upper bound
+        err (number, optional): Absolute error tolerance. Defaults to 1e-10.
+        rel (number, optional): Relative error tolerance. Defaults to 1e-10.
+        vectorized (bool, optional): func takes and returns arrays (numpy ufunc style),
+            the new midpoints of a level are then passed in one call. Defaults to False.
+        maxLevel (int, optional): Maximum number of step halvings (2^maxLevel+1 evaluations). Defaults to 20.
+
+    Returns:
+        tuple[number,number,int]: Approximate integral of func from a to b, error estimate, number of evaluations
+    """
+    h = b-a
+    R = [h*(func(a)+func(b))/2]
+    n = 2
+    e = abs(R[0])
+    for k in range(1,maxLevel+1):
+        x = a+h*(np.arange(2**(k-1))+0.5)
+        s = np.sum(func(x)) if vectorized else sum(func(t) for t in x.tolist())
+        n += len(x)
+        h /= 2
+        row = [R[0]/2+h*s]
+        for j in range(1,k+1):
+            row.append(row[j-1]+(row[j-1]-R[j-1])/(4**j-1))
+        e = abs(row[k]-R[k-1])
+        R = row
+        if k >= 3 and e <= max(err,rel*abs(R[k])):
+            break
+    return float(R[-1]),float(e),n
+
 def maximize(func:Callable[[number],number],a:number,b:number,err:number=1e-6) -> number:
     """
-    Find the maximum of a function using the golden section search.
+    Find the maximum of a function using the golden section search, see optimize.
 
     Args:
         func (Callable[[number],number]): Function to maximize
@@ -62,22 +308,12 @@ def maximize(func:Callable[[number],number],a:number,b:number,err:number=1e-6) -
     Returns:
         number: x such that func(x) is maximized
     """
-    gr = (5**0.5-1)/2
-    c = b-gr*(b-a)
-    d = a+gr*(b-a)
-    while abs(c-d)>err:
-        if func(c)>func(d):
-            b = d
-        else:
-            a = c
-        c = b-gr*(b-a)
-        d = a+gr*(b-a)
-    return (a+b)/2
+    return optimize(func,a,b,err,"golden",maximize=True)[0]
 
 
 def minimize(func:Callable[[number],number],a:number,b:number,err:number=1e-6) -> number:
     """
-    Find the minimum of a function using the golden section search.
+    Find the minimum of a function using the golden section search, see optimize.
 
     Args:
         func (Callable[[number],number]): Function to minimize
@@ -88,19 +324,379 @@ def minimize(func:Callable[[number],number],a:number,b:number,err:number=1e-6) -
     Returns:
         number: x such that func(x) is minimized
     """
-    gr = (5**0.5-1)/2
-    c = b-gr*(b-a)
-    d = a+gr*(b-a)
-    while abs(c-d)>err:
-        if func(c)<func(d):
-            b = d
-        else:
-            a = c
+    return optimize(func,a,b,err,"golden")[0]
+
+def optimize(func:Callable[[number],number],a:number,b:number,err:number=1e-6,mode:Literal["golden","brent"]="brent",maxEval:int|None=None,maximize:bool=False) -> tuple[number,number,int]:
+    """
+    Find the minimum (or maximum) of a unimodal function on an interval.
+
+    golden is the golden section search, keeping the surviving inner point and its value so every
+    step costs one evaluation. brent is Brent's method, parabolic interpolation through the three best
+    points with golden section steps as a fallback, which converges much faster on smooth functions.
+
+    Args:
+        func (Callable[[number],number]): Function to optimize
+        a (number): Lower bound
+        b (number): Upper bound
+        err (number, optional): Error tolerance on x. Defaults to 1e-6.
+        mode (Literal["golden","brent"], optional): The method. Defaults to "brent".
+        maxEval (int|None, optional): Stop after this many evaluations. Defaults to None.
+        maximize (bool, optional): Find the maximum instead. Defaults to False.
+
+    Returns:
+        tuple[number,number,int]: Best x, func(x), number of evaluations
+    """
+    sgn = -1 if maximize else 1
+    n = 0
+    def g(x):
+        nonlocal n
+        n += 1
+        return sgn*func(x)
+    budget = maxEval if maxEval is not None else float("inf")
+    if a > b:
+        a,b = b,a
+    if mode == "golden":
+        gr = (5**0.5-1)/2
         c = b-gr*(b-a)
         d = a+gr*(b-a)
-    return (a+b)/2
+        fc,fd = g(c),g(d)
+        while abs(c-d) > err and n < budget:
+            if fc < fd:
+                b,d,fd = d,c,fc
+                c = b-gr*(b-a)
+                fc = g(c)
+            else:
+                a,c,fc = c,d,fd
+                d = a+gr*(b-a)
+                fd = g(d)
+        x,fx = (c,fc) if fc < fd else (d,fd)
+        return x,sgn*fx,n
+    cg = (3-5**0.5)/2
+    x = w = v = a+cg*(b-a)
+    fx = fw = fv = g(x)
+    d = e = 0.
+    while n < budget:
+        xm = (a+b)/2
+        tol = err/2+1e-12*abs(x)
+        if abs(x-xm) <= 2*tol-(b-a)/2:
+            break
+        golden = True
+        if abs(e) > tol:
+            r = (x-w)*(fx-fv)
+            q = (x-v)*(fx-fw)
+            p = (x-v)*q-(x-w)*r
+            q = 2*(q-r)
+            if q > 0:
+                p = -p
+            q = abs(q)
+            if abs(p) < abs(q*e/2) and q*(a-x) < p < q*(b-x):
+                e,d = d,p/q
+                golden = False
+                if x+d-a < 2*tol or b-x-d < 2*tol:
+                    d = tol if xm > x else -tol
+        if golden:
+            e = a-x if x >= xm else b-x
+            d = cg*e
+        u = x+d if abs(d) >= tol else x+(tol if d > 0 else -tol)
+        fu = g(u)
+        if fu <= fx:
+            if u >= x:
+                a = x
+            else:
+                b = x
+            v,w,x = w,x,u
+            fv,fw,fx = fw,fx,fu
+        else:
+            if u < x:
+                a = u
+            else:
+                b = u
+            if fu <= fw or w == x:
+                v,w = w,u
+                fv,fw = fw,fu
+            elif fu <= fv or v == x or v == w:
+                v,fv = u,fu
+    return x,sgn*fx,n
+
+_DPC = np.array([0,1/5,3/10,4/5,8/9,1])
+_DPA = [np.array([]),np.array([1/5]),np.array([3/40,9/40]),np.array([44/45,-56/15,32/9]),
+        np.array([19372/6561,-25360/2187,64448/6561,-212/729]),np.array([9017/3168,-355/33,46732/5247,49/176,-5103/18656])]
+_DPB = np.array([35/384,0,500/1113,125/192,-2187/6784,11/84,0])
+_DPE = np.array([71/57600,0,-71/16695,71/1920,-17253/339200,22/525,-1/40]) #5th minus embedded 4th order weights
+_DPP = np.array([[1,-8048581381/2820520608,8663915743/2820520608,-12715105075/11282082432],
+    [0,0,0,0],
+    [0,131558114200/32700410799,-68118460800/10900136933,87487479700/32700410799],
+    [0,-1754552775/470086768,14199869525/1410260304,-10690763975/1880347072],
+    [0,127303824393/49829197408,-318862633887/49829197408,701980252875/199316789632],
+    [0,-282668133/205662961,2019193451/616988883,-1453857185/822651844],
+    [0,40617522/29380423,-110615467/29380423,69997945/29380423]]) #Dense output polynomial of the stages
+
+class ODESolution:
+    """Solution of an ODE system from rk45 or rosenbrock, with dense output.
+
+    t holds the accepted step times, y the state at each of them (len(t),dim) and evals the number of
+    derivative evaluations (jacs Jacobians and factors inverted W=I-h*d*J matrices for rosenbrock).
+    Call the object with any t in the integration range for the state there."""
+
+    def __init__(self,t:list[number],y:list[NDArray],Q:list[NDArray],evals:int,jacs:int=0,factors:int=0) -> None:
+        self.t = np.array(t)
+        self.y = np.array(y)
+        self._Q = np.array(Q).reshape(len(Q),self.y.shape[1],4) #Interpolant coefficients of every step
+        self.evals = evals
+        self.jacs = jacs
+        self.factors = factors
+
+    def __repr__(self) -> str:
+        return f"ODE solution on [{self.t[0]},{self.t[-1]}] in {len(self.t)-1} steps, {self.evals} evaluations"
+
+    def __call__(self,t:number|list[number]|NDArray) -> NDArray:
+        """State at t (dim,), or (len(t),dim) for several t."""
+        u = np.asarray(t,dtype=np.float64)
+        if not len(self._Q):
+            return np.broadcast_to(self.y[0],u.shape+self.y.shape[1:]).copy()
+        s = self.t if self.t[-1] >= self.t[0] else -self.t
+        i = np.clip(np.searchsorted(s,u if s is self.t else -u,side="right")-1,0,len(self.t)-2)
+        h = self.t[i+1]-self.t[i]
+        x = (u-self.t[i])/h
+        p = np.stack([x,x*x,x**3,x**4],axis=-1)
+        return self.y[i]+(h[...,None] if np.ndim(h) else h)*np.einsum("...dk,...k->...d",self._Q[i],p)
+
+def rk45(f:Callable[[number,NDArray],NDArray],y0:number|list[number]|NDArray,t0:number,t1:number,err:number=1e-8,rel:number=1e-8,maxSteps:int=100000) -> ODESolution:
+    """
+    Solve an ODE system y' = f(t,y) with the adaptive Dormand-Prince 5(4) Runge-Kutta method.
+
+    The step size is chosen so the embedded error estimate stays within err+rel*|y| per component,
+    six evaluations per step (the last stage is reused as the first of the next step).
+
+    Args:
+        f (Callable[[number,NDArray],NDArray]): Function (t,y) giving the derivative of the state array y
+        y0 (number|list[number]|NDArray): Initial state
+        t0 (number): Initial value of t
+        t1 (number): Final value of t, may be less than t0
+        err (number, optional): Absolute error tolerance. Defaults to 1e-8.
+        rel (number, optional): Relative error tolerance. Defaults to 1e-8.
+        maxSteps (int, optional): Maximum number of steps. Defaults to 100000.
+
+    Returns:
+        ODESolution: The solution, with dense output
+
+    Raises:
+        ValueError: If maxSteps is reached or the step size underflows.
+    """
+    y = np.atleast_1d(np.asarray(y0,dtype=np.float64)).copy()
+    t = t0
+    d = 1. if t1 >= t0 else -1.
+    F = lambda t,y: np.atleast_1d(np.asarray(f(t,y),dtype=np.float64))
+    k0 = F(t,y)
+    n = 1
+    ts,ys,Q = [t],[y],[]
+    if t1 == t0:
+        return ODESolution(ts,ys,Q,n)
+    sc = err+rel*np.abs(y)
+    d0,d1 = np.sqrt(np.mean((y/sc)**2)),np.sqrt(np.mean((k0/sc)**2))
+    h = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01*d0/d1
+    h = min(h,abs(t1-t0))
+    K = np.empty((7,len(y)))
+    w = np.empty(len(y)) #Stage state buffer
+    for i in range(maxSteps):
+        if h < 1e-14*max(abs(t),1.):
+            raise ValueError(f"Step size underflow at t={t}")
+        h = min(h,abs(t1-t))
+        K[0] = k0
+        for j in range(1,6):
+            np.dot(_DPA[j],K[:j],out=w)
+            w *= d*h
+            w += y
+            K[j] = F(t+d*h*_DPC[j],w)
+        yn = y+d*h*(_DPB[:6]@K[:6])
+        K[6] = F(t+d*h,yn)
+        n += 6
+        e = np.sqrt(np.mean((h*(_DPE@K)/(err+rel*np.maximum(np.abs(y),np.abs(yn))))**2))
+        if e <= 1:
+            Q.append(K.T@_DPP)
+            t = t1 if h == abs(t1-t) else t+d*h
+            y,k0 = yn,K[6].copy()
+            ts.append(t)
+            ys.append(y)
+            if t == t1:
+                return ODESolution(ts,ys,Q,n)
+        h *= min(5.,max(0.2,0.9*e**-0.2)) if e > 0 else 5.
+    raise ValueError(f"No convergence in {maxSteps} steps")
+
+def colGroups(pattern:NDArray) -> list[NDArray]:
+    """
+    Group the columns of a Jacobian sparsity pattern so no two columns of a group share a row
+    (greedy Curtis-Powell-Reid), a finite difference Jacobian then needs one evaluation per group.
 
-def ODE1(dydt : Callable[[number,number],number],y0:number,t0:number,t1:number,n:int) -> number:
+    Args:
+        pattern (NDArray): (dim,dim) boolean, pattern[i,j] when component i depends on y[j]
+
+    Returns:
+        list[NDArray]: Column indices of every group
+    """
+    pattern = np.asarray(pattern,dtype=bool)
+    groups:list[list[int]] = []
+    rows:list[NDArray] = []
+    for j in range(pattern.shape[1]):
+        for g,r in zip(groups,rows):
+            if not (r & pattern[:,j]).any():
+                g.append(j)
+                r |= pattern[:,j]
+                break
+        else:
+            groups.append([j])
+            rows.append(pattern[:,j].copy())
+    return [np.array(g) for g in groups]
+
+def fdJac(f:Callable[[number,NDArray],NDArray],t:number,y:NDArray,f0:NDArray|None=None,groups:list[NDArray]|None=None,pattern:NDArray|None=None) -> tuple[NDArray,int]:
+    """
+    Forward difference Jacobian of f(t,y) with respect to y.
+
+    Args:
+        f (Callable[[number,NDArray],NDArray]): Function (t,y) giving an array
+        t (number): t
+        y (NDArray): State array
+        f0 (NDArray|None, optional): f(t,y) if already known. Defaults to None.
+        groups (list[NDArray]|None, optional): Column groups from colGroups, each perturbed in one evaluation.
+            Defaults to None, one column at a time.
+        pattern (NDArray|None, optional): The sparsity pattern the groups were made from, required with groups.
+            Defaults to None.
+
+    Returns:
+        tuple[NDArray,int]: (dim,dim) Jacobian, number of evaluations
+
+    Raises:
+        ValueError: If groups is given without pattern.
+    """
+    if groups is not None and pattern is None:
+        raise ValueError("Column groups need the sparsity pattern they were made from")
+    if pattern is not None:
+        pattern = np.asarray(pattern,dtype=bool)
+    y = np.asarray(y,dtype=np.float64)
+    n = 0
+    if f0 is None:
+        f0 = np.asarray(f(t,y),dtype=np.float64)
+        n += 1
+    if groups is None:
+        groups = [np.array([j]) for j in range(len(y))]
+    J = np.zeros((len(f0),len(y)))
+    dy = 1.5e-8*np.maximum(np.abs(y),1.)
+    u = y.copy()
+    for g in groups:
+        u[g] += dy[g]
+        d = (np.asarray(f(t,u),dtype=np.float64)-f0)
+        n += 1
+        u[g] = y[g]
+        if len(g) == 1:
+            J[:,g[0]] = d/dy[g[0]]
+        else:
+            for j in g:
+                rows = pattern[:,j]
+                J[rows,j] = d[rows]/dy[j]
+    return J,n
+
+def rosenbrock(f:Callable[[number,NDArray],NDArray],y0:number|list[number]|NDArray,t0:number,t1:number,err:number=1e-6,rel:number=1e-6,jac:Callable[[number,NDArray],NDArray]|None=None,pattern:NDArray|None=None,maxSteps:int=100000) -> ODESolution:
+    """
+    Solve a stiff ODE system y' = f(t,y) with the adaptive Rosenbrock-W 2(3) method (Shampine's ode23s).
+
+    Every step solves three linear systems with W=I-h*d*J, inverted once (Mat.inv) and applied as a product.
+    The Jacobian is kept across steps and recomputed only when a step fails or asks to shrink by more
+    than half, and the step size is held while the proposed change is within [0.8,1.5] so W is reused as well.
+
+    Args:
+        f (Callable[[number,NDArray],NDArray]): Function (t,y) giving the derivative of the state array y
+        y0 (number|list[number]|NDArray): Initial state
+        t0 (number): Initial value of t
+        t1 (number): Final value of t, may be less than t0
+        err (number, optional): Absolute error tolerance. Defaults to 1e-6.
+        rel (number, optional): Relative error tolerance. Defaults to 1e-6.
+        jac (Callable[[number,NDArray],NDArray]|None, optional): Function (t,y) giving the (dim,dim) Jacobian.
+            Defaults to None, forward differences.
+        pattern (NDArray|None, optional): (dim,dim) boolean sparsity pattern of the Jacobian, the forward differences
+            then perturb non-overlapping columns together (see colGroups). Defaults to None.
+        maxSteps (int, optional): Maximum number of steps. Defaults to 100000.
+
+    Returns:
+        ODESolution: The solution, with dense output
+
+    Raises:
+        ValueError: If maxSteps is reached or the step size underflows.
+    """
+    y = np.atleast_1d(np.asarray(y0,dtype=np.float64)).copy()
+    t = t0
+    s = 1. if t1 >= t0 else -1.
+    F = lambda t,y: np.atleast_1d(np.asarray(f(t,y),dtype=np.float64))
+    groups = colGroups(pattern) if pattern is not None and jac is None else None
+    d = 1/(2+2**0.5)
+    e32 = 6+2**0.5
+    F0 = F(t,y)
+    n,nj,nl = 1,0,0
+    ts,ys,Q = [t],[y],[]
+    if t1 == t0:
+        return ODESolution(ts,ys,Q,n)
+    sc = err+rel*np.abs(y)
+    d0,d1 = np.sqrt(np.mean((y/sc)**2)),np.sqrt(np.mean((F0/sc)**2))
+    h = min(1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01*d0/d1,abs(t1-t0))
+    I = np.identity(len(y))
+    J = None
+    W = None
+    for i in range(maxSteps):
+        if J is None:
+            if jac is None:
+                J,k = fdJac(F,t,y,F0,groups,pattern)
+                n += k
+            else:
+                J = np.asarray(jac(t,y),dtype=np.float64)
+            nj += 1
+            fresh = True
+            W = None
+        if h < 1e-14*max(abs(t),1.):
+            raise ValueError(f"Step size underflow at t={t}")
+        if abs(t1-t) < h:
+            h = abs(t1-t)
+            W = None
+        H = s*h
+        dt = 1.5e-8*max(abs(t),1.)
+        T = (F(t+s*dt,y)-F0)/dt #df/dt, cheap so never reused
+        n += 1
+        if W is None:
+            W = Mat(I-H*d*J).inv().a
+            nl += 1
+        k1 = W@(F0+H*d*T)
+        F1 = F(t+H/2,y+H/2*k1)
+        k2 = W@(F1-k1)+k1
+        yn = y+H*k2
+        F2 = F(t+H,yn)
+        k3 = W@(F2-e32*(k2-F1)-2*(k1-F0)+H*d*T)
+        n += 2
+        e = np.sqrt(np.mean((h/6*(k1-2*k2+k3)/(err+rel*np.maximum(np.abs(y),np.abs(yn))))**2))
+        fac = min(5.,max(0.2,0.8*e**(-1/3))) if e > 0 else 5.
+        if e <= 1:
+            Q.append(np.stack([(k1-2*d*k2)/(1-2*d),(k2-k1)/(1-2*d),np.zeros(len(y)),np.zeros(len(y))],axis=-1))
+            t = t1 if h == abs(t1-t) else t+H
+            y,F0 = yn,F2
+            ts.append(t)
+            ys.append(y)
+            if t == t1:
+                return ODESolution(ts,ys,Q,n,nj,nl)
+            fresh = False
+            if fac < 0.5: #Large shrink, the Jacobian may be stale
+                J = None
+            if not 0.8 <= fac <= 1.5:
+                h *= fac
+                W = None
+        else:
+            if not fresh:
+                J = None
+            h *= fac
+            W = None
+    raise ValueError(f"No convergence in {maxSteps} steps")
+
+def _integrate(method:Literal["rk45","rosenbrock"],f:Callable[[number,NDArray],NDArray],y0:number|list[number]|NDArray,t0:number,t1:number,err:number) -> ODESolution:
+    """Adaptive solve of y' = f(t,y) with the method the ODE functions were asked for FOR INTERNAL USE ONLY"""
+    return (rosenbrock if method == "rosenbrock" else rk45)(f,y0,t0,t1,err,err)
+
+def ODE1(dydt : Callable[[number,number],number],y0:number,t0:number,t1:number,n:int,method:Literal["euler","rk45","rosenbrock"]="euler",err:number=1e-8) -> number:
     """
     Solve a first order ordinary differential equation using Euler's method.
 
@@ -109,11 +705,16 @@ def ODE1(dydt : Callable[[number,number],number],y0:number,t0:number,t1:number,n
         y0 (number): Initial value of y
         t0 (number): Initial value of t
         t1 (number): Final value of t
-        n (int): Number of steps
+        n (int): Number of steps, unused by the adaptive methods
+        method (Literal["euler","rk45","rosenbrock"], optional): Fixed step Euler, or adaptive rk45 (rosenbrock for stiff problems)
+            to tolerance err. Defaults to "euler".
+        err (number, optional): Absolute and relative error tolerance of the adaptive methods. Defaults to 1e-8.
 
     Returns:
         number: Approximate value of y at t1
     """
+    if method != "euler":
+        return float(_integrate(method,lambda t,y: dydt(t,y[0]),y0,t0,t1,err).y[-1,0])
     h = (t1-t0)/n
     t = t0
     y = y0
@@ -122,7 +723,7 @@ def ODE1(dydt : Callable[[number,number],number],y0:number,t0:number,t1:number,n
         t += h
     return y
 
-def ODE1A(dydt : Callable[[number,number],number],y0:number,t0:number,t1:number,n:int) -> tuple[list[number],list[number]]:
+def ODE1A(dydt : Callable[[number,number],number],y0:number,t0:number,t1:number,n:int,method:Literal["euler","rk45","rosenbrock"]="euler",err:number=1e-8) -> tuple[list[number],list[number]]:
     """
     Solve a first order ordinary differential equation using Euler's method.
     Returns all steps, time.
@@ -132,11 +733,17 @@ def ODE1A(dydt : Callable[[number,number],number],y0:number,t0:number,t1:number,
         y0 (number): Initial value of y
         t0 (number): Initial value of t
         t1 (number): Final value of t
-        n (int): Number of steps
+        n (int): Number of steps, the number of output intervals for the adaptive methods
+        method (Literal["euler","rk45","rosenbrock"], optional): Fixed step Euler, or adaptive rk45 (rosenbrock for stiff problems)
+            to tolerance err with the outputs from its dense output. Defaults to "euler".
+        err (number, optional): Absolute and relative error tolerance of the adaptive methods. Defaults to 1e-8.
 
     Returns:
         tuple[list[number],list[number]]: [time[], y[]]
     """
+    if method != "euler":
+        tt = np.linspace(t0,t1,n+1)
+        return tt.tolist(),_integrate(method,lambda t,y: dydt(t,y[0]),y0,t0,t1,err)(tt)[:,0].tolist()
     h = (t1-t0)/n
     t = t0
     y = y0
@@ -151,7 +758,7 @@ def ODE1A(dydt : Callable[[number,number],number],y0:number,t0:number,t1:number,
         outt[i+1] = t
     return outt,outy
 
-def ODEx(dfunc : Callable[...,number],iv:list[number],t0:number,t1:number,n:int):
+def ODEx(dfunc : Callable[...,number],iv:list[number],t0:number,t1:number,n:int,method:Literal["euler","rk45","rosenbrock"]="euler",err:number=1e-8):
     """
     Solve a nth order ordinary differential equation using Euler's method.
 
@@ -160,11 +767,16 @@ def ODEx(dfunc : Callable[...,number],iv:list[number],t0:number,t1:number,n:int)
         iv (list[number]): Initial values of y and its derivatives in increasing order
         t0 (number): Initial value of t
         t1 (number): Final value of t
-        n (int): Number of steps
+        n (int): Number of steps, unused by the adaptive methods
+        method (Literal["euler","rk45","rosenbrock"], optional): Fixed step Euler, or adaptive rk45 (rosenbrock for stiff problems)
+            to tolerance err. Defaults to "euler".
+        err (number, optional): Absolute and relative error tolerance of the adaptive methods. Defaults to 1e-8.
 
     Returns:
         number: Approximate value of y at t1
     """
+    if method != "euler":
+        return float(_integrate(method,lambda t,y: np.append(y[1:],dfunc(t,*y)),iv,t0,t1,err).y[-1,0])
     h = (t1-t0)/n
     t = t0
     cv = iv.copy()
@@ -175,7 +787,7 @@ def ODEx(dfunc : Callable[...,number],iv:list[number],t0:number,t1:number,n:int)
         t += h
     return cv[0]
 
-def ODExA(dfunc : Callable[...,number],iv:list[number],t0:number,t1:number,n:int):
+def ODExA(dfunc : Callable[...,number],iv:list[number],t0:number,t1:number,n:int,method:Literal["euler","rk45","rosenbrock"]="euler",err:number=1e-8):
     """
     Solve a nth order ordinary differential equation using Euler's method.
     Returns all steps, time.
@@ -185,12 +797,18 @@ def ODExA(dfunc : Callable[...,number],iv:list[number],t0:number,t1:number,n:int
         iv (list[number]): Initial values of y and its derivatives in increasing order
         t0 (number): Initial value of t
         t1 (number): Final value of t
-        n (int): Number of steps
+        n (int): Number of steps, the number of output intervals for the adaptive methods
+        method (Literal["euler","rk45","rosenbrock"], optional): Fixed step Euler, or adaptive rk45 (rosenbrock for stiff problems)
+            to tolerance err with the outputs from its dense output. Defaults to "euler".
+        err (number, optional): Absolute and relative error tolerance of the adaptive methods. Defaults to 1e-8.
     
     Returns:
         tuple[list[number],list[list[number]]]: time[], degree[y[]] in increasing order
     """
 
+    if method != "euler":
+        tt = np.linspace(t0,t1,n+1)
+        return tt.tolist(),_integrate(method,lambda t,y: np.append(y[1:],dfunc(t,*y)),iv,t0,t1,err)(tt).tolist()
     h = (t1-t0)/n
     t = t0
     cv = iv.copy()
@@ -206,7 +824,7 @@ def ODExA(dfunc : Callable[...,number],iv:list[number],t0:number,t1:number,n:int
         outt.append(t)
     return outt,out
 
-def SODE1(fs: list[Callable[...,number]], iv: list[number], t0:number, t1:number, n:int) -> list[number]:
+def SODE1(fs: list[Callable[...,number]]|Callable[[number,NDArray],NDArray], iv: list[number], t0:number, t1:number, n:int, method:Literal["euler","rk45","rosenbrock"]="euler", err:number=1e-8) -> list[number]:
     """
     Solve a system of first order ordinary differential equations using Euler's method.
     Function input order is important.
@@ -218,16 +836,24 @@ def SODE1(fs: list[Callable[...,number]], iv: list[number], t0:number, t1:number
     ]
 
     Args:
-        fs (list[Callable[...,number]]): List of functions representing the derivatives 
+        fs (list[Callable[...,number]]|Callable[[number,NDArray],NDArray]): List of functions representing the derivatives,
+            or one function (t,y) giving the derivative array of the state array y, solved with SODE
         iv (list[number]): Initial values
         t0 (number): Initial value of t
         t1 (number): Final value of t
-        n (int): Number of steps
+        n (int): Number of steps, unused by the adaptive methods
+        method (Literal["euler","rk45","rosenbrock"], optional): Fixed step Euler, or adaptive rk45 (rosenbrock for stiff problems)
+            to tolerance err. Defaults to "euler".
+        err (number, optional): Absolute and relative error tolerance of the adaptive methods. Defaults to 1e-8.
 
     Returns:
         list[number]: Approximate values at t1
     """
 
+    if callable(fs):
+        return SODE(fs,iv,t0,t1,n,method,err).tolist()
+    if method != "euler":
+        return _integrate(method,lambda t,y: [f(t,*y) for f in fs],iv,t0,t1,err).y[-1].tolist()
     h = (t1-t0)/n
     t = t0
     cv = iv.copy()
@@ -235,4 +861,104 @@ def SODE1(fs: list[Callable[...,number]], iv: list[number], t0:number, t1:number
         for j in range(len(cv)):
             cv[j] += h*fs[j](t,*cv)
         t += h
-    return cv
\ No newline at end of file
+    return cv
+
+def SODE(f: Callable[[number,NDArray],NDArray], iv: list[number]|NDArray, t0:number, t1:number, n:int, method:Literal["euler","rk45","rosenbrock"]="euler", err:number=1e-8) -> NDArray:
+    """
+    Solve a system of first order ordinary differential equations y' = f(t,y) for a state array y.
+
+    One call of f per step (per stage for rk45) whatever the size of the system,
+    the state and step buffers are allocated once.
+
+    Args:
+        f (Callable[[number,NDArray],NDArray]): Function (t,y) giving the derivative array of the state array y
+        iv (list[number]|NDArray): Initial values
+        t0 (number): Initial value of t
+        t1 (number): Final value of t
+        n (int): Number of steps, unused by the adaptive methods
+        method (Literal["euler","rk45","rosenbrock"], optional): Fixed step Euler, or adaptive rk45 (rosenbrock for stiff problems)
+            to tolerance err. Defaults to "euler".
+        err (number, optional): Absolute and relative error tolerance of the adaptive methods. Defaults to 1e-8.
+
+    Returns:
+        NDArray: Approximate values at t1
+    """
+    if method != "euler":
+        return _integrate(method,f,iv,t0,t1,err).y[-1]
+    h = (t1-t0)/n
+    y = np.array(iv,dtype=np.float64)
+    k = np.empty_like(y)
+    for i in range(n):
+        np.multiply(f(t0+i*h,y),h,out=k)
+        y += k
+    return y
+
+def SODEA(f: Callable[[number,NDArray],NDArray], iv: list[number]|NDArray, t0:number, t1:number, n:int, method:Literal["euler","rk45","rosenbrock"]="euler", err:number=1e-8) -> tuple[NDArray,NDArray]:
+    """
+    Solve a system of first order ordinary differential equations y' = f(t,y) for a state array y, see SODE.
+    Returns all steps, time.
+
+    Args:
+        f (Callable[[number,NDArray],NDArray]): Function (t,y) giving the derivative array of the state array y
+        iv (list[number]|NDArray): Initial values
+        t0 (number): Initial value of t
+        t1 (number): Final value of t
+        n (int): Number of steps, the number of output intervals for the adaptive methods
+        method (Literal["euler","rk45","rosenbrock"], optional): Fixed step Euler, or adaptive rk45 (rosenbrock for stiff problems)
+            to tolerance err with the outputs from its dense output. Defaults to "euler".
+        err (number, optional): Absolute and relative error tolerance of the adaptive methods. Defaults to 1e-8.
+
+    Returns:
+        tuple[NDArray,NDArray]: time (n+1,), values (n+1,len(iv))
+    """
+    tt = np.linspace(t0,t1,n+1)
+    if method != "euler":
+        return tt,_integrate(method,f,iv,t0,t1,err)(tt)
+    h = (t1-t0)/n
+    out = np.empty((n+1,len(iv)))
+    out[0] = iv
+    k = np.empty(len(iv))
+    for i in range(n):
+        np.multiply(f(t0+i*h,out[i]),h,out=k)
+        np.add(out[i],k,out=out[i+1])
+    return tt,out
+
+def levMar(model:Callable[[NDArray,NDArray],NDArray],jac:Callable[[NDArray,NDArray],NDArray],p0:list[number]|NDArray,x:NDArray,y:NDArray,maxIter:int=100,tol:number=1e-12) -> tuple[NDArray,int]:
+    """
+    Nonlinear least squares fit using the Levenberg-Marquardt method.
+
+    Args:
+        model (Callable[[NDArray,NDArray],NDArray]): Function (x,p) giving the model at every x
+        jac (Callable[[NDArray,NDArray],NDArray]): Function (x,p) giving the (len(x),len(p)) Jacobian of model
+        p0 (list[number]|NDArray): Initial parameters, a good warm start converges in a few iterations
+        x (NDArray): x values
+        y (NDArray): y values
+        maxIter (int, optional): Maximum number of iterations. Defaults to 100.
+        tol (number, optional): Relative tolerance on the step and the sum of squares. Defaults to 1e-12.
+
+    Returns:
+        tuple[NDArray,int]: Parameters minimising sum((y-model(x,p))^2), iterations used
+    """
+    p = np.asarray(p0,dtype=np.float64)
+    r = y-model(x,p)
+    cost = r@r
+    lam = 1e-3
+    for i in range(1,maxIter+1):
+        J = jac(x,p)
+        A = J.T@J
+        g = J.T@r
+        while True:
+            step = np.linalg.solve(A+lam*np.diag(np.diag(A)+1e-300),g)
+            rn = y-model(x,p+step)
+            cn = rn@rn
+            if cn <= cost:
+                lam = max(lam/10,1e-12)
+                break
+            lam *= 10
+            if lam > 1e16:
+                return p,i
+        done = cost-cn <= tol*cost or np.abs(step).max() <= tol*(np.abs(p).max()+tol)
+        p,r,cost = p+step,rn,cn
+        if done:
+            return p,i
+    return p,maxIter
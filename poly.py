@@ -12,4 +12,90 @@ def solvePoly(*coeffs)-> list[complex]:
         list: The roots of the polynomial equation
     """
     poly = numpy.polynomial.Polynomial(coeffs[::-1])
-    return poly.roots()
\ No newline at end of file
+    return poly.roots()
+
+def horner(coeffs: list[number] | NDArray, x: number | list[number] | NDArray):
+    """Evaluate a polynomial with Horner's method
+
+    Args:
+        coeffs (list[number] | NDArray): The coefficients in the form [a,b,c,...] for ax^n + bx^(n-1) + ... + c
+        x (number | list[number] | NDArray): The x value(s)
+
+    Returns:
+        number | NDArray: The polynomial at x, an array if x is a list or array
+    """
+    if not numpy.isscalar(x):
+        x = numpy.asarray(x, dtype=numpy.float64)
+    r = 0*x
+    for c in coeffs:
+        r = r*x+c
+    return r
+
+
+def solvePolyArr(coeffs: list[number] | NDArray, y: number | list[number] | NDArray = 0, chunk: int = 65536) -> NDArray:
+    """Solve ax^n + bx^(n-1) + ... + c = y for many y at once
+
+    Degrees up to 3 use closed forms (with a Newton polish for cubics),
+    higher degrees the eigenvalues of a stack of companion matrices.
+
+    Args:
+        coeffs (list[number] | NDArray): The coefficients in the form [a,b,c,...]
+        y (number | list[number] | NDArray, optional): The target value(s). Defaults to 0.
+        chunk (int, optional): Companion matrices solved per batch. Defaults to 65536.
+
+    Returns:
+        NDArray: Complex roots sorted per target, shape (n,) for a scalar y or (len(y),n)
+            n is the degree after dropping leading zero coefficients, 0 (no roots) for a constant
+
+    Raises:
+        ValueError: If all coefficients are zero.
+
+    Examples:
+        >>> solvePolyArr([1,0,-1],[0,3])
+        array([[-1.+0.j,  1.+0.j],
+               [-2.+0.j,  2.+0.j]])
+    """
+    c = numpy.trim_zeros(numpy.asarray(coeffs, dtype=numpy.float64), 'f')
+    if len(c) == 0:
+        raise ValueError("All coefficients are zero")
+    n = len(c)-1
+    scalar = numpy.isscalar(y)
+    d = ((c[-1]-numpy.atleast_1d(numpy.asarray(y, dtype=numpy.float64)))/c[0]).astype(numpy.complex128)
+    c = c/c[0]
+    if n == 0:
+        r = numpy.empty((len(d), 0), dtype=numpy.complex128)
+    elif n == 1:
+        r = -d[:, None]
+    elif n == 2:
+        b = c[1]
+        s = numpy.sqrt(b*b-4*d)
+        q = -(b+numpy.where((numpy.conj(b)*s).real >= 0, s, -s))/2 #Avoids cancellation
+        safe = numpy.where(q == 0, 1, q)
+        r = numpy.stack([q, numpy.where(q == 0, 0, d/safe)], axis=-1)
+    elif n == 3:
+        b, e = c[1], c[2]
+        d0 = b*b-3*e
+        d1 = 2*b**3-9*b*e+27*d
+        s = numpy.sqrt(d1*d1-4*d0**3+0j)
+        C = (d1+numpy.where(numpy.abs(d1+s) >= numpy.abs(d1-s), s, -s))/2
+        C = C**(1/3)
+        xi = numpy.exp(2j*numpy.pi/3)**numpy.arange(3)
+        Ck = C[:, None]*xi[None, :]
+        safe = numpy.where(Ck == 0, 1, Ck)
+        r = numpy.where(Ck == 0, -b/3, -(b+Ck+d0/safe)/3)
+        p = r**3+b*r**2+e*r+d[:, None]
+        dp = 3*r**2+2*b*r+e
+        r = r-numpy.where(dp == 0, 0, p/numpy.where(dp == 0, 1, dp))
+    else:
+        comp = numpy.zeros((n, n))
+        comp[0, :-1] = -c[1:-1]
+        comp[numpy.arange(1, n), numpy.arange(n-1)] = 1
+        r = numpy.empty((len(d), n), dtype=numpy.complex128)
+        for i in range(0, len(d), chunk):
+            m = numpy.broadcast_to(comp, (len(d[i:i+chunk]), n, n)).astype(numpy.complex128)
+            m[:, 0, -1] = -d[i:i+chunk]
+            r[i:i+chunk] = numpy.linalg.eigvals(m)
+    #Drop rounding noise in the imaginary part of real roots
+    r = r.real+1j*numpy.where(numpy.abs(r.imag) <= 1e-12*numpy.maximum(1, numpy.abs(r.real)), 0, r.imag)
+    r = numpy.sort(r, axis=-1)
+    return r[0] if scalar else r
@@ -1,25 +1,174 @@
 from abc import abstractmethod
+from copy import copy
 from functools import cached_property
+from itertools import islice
 from math import exp, log, sqrt
-from typing import Literal, Union
-from .poly import solvePoly
+from typing import Iterable, Literal, Union
+from .poly import horner,solvePolyArr
 from .load import ldfe,ldf
 from .listelemop import *
 from .typedef import *
 from .matrix import AugMat
+from .contDistribution import TpApprox
+from .nsolve import levMar
 import numpy as np
 
-def bestFit(reg:"Reg") -> "Reg":
+def _score(reg:"Reg",criterion:str) -> float:
+    """Selection score of a candidate, higher is better, nan if it cannot be fitted FOR INTERNAL USE ONLY"""
+    try:
+        with np.errstate(all="ignore"):
+            v=float(getattr(reg,criterion))
+    except (ValueError,ZeroDivisionError,np.linalg.LinAlgError):
+        return float("nan")
+    return -v if criterion in ("aic","bic") else v
+
+def _scoreData(cls:type["Reg"],x:NDArray,fx:NDArray,criterion:str) -> float:
+    """_score for a process pool, rebuilding the candidate from arrays which pickle fast FOR INTERNAL USE ONLY"""
+    return _score(cls(x.tolist(),fx.tolist()),criterion)
+
+def bestFit(reg:"Reg",candidates:list[type["Reg"]]|None=None,maxDegree:int=0,criterion:Literal["rsq","adjRsq","aic","bic"]="rsq",workers:int=0,pool:Literal["thread","process"]="thread",patience:int=2,tol:float=1e-9) -> "Reg":
     """Find the best fit regression line for a regression object.
     
+    Every candidate shares the power sums of reg, computed once.
+    PolyReg degrees are fitted incrementally from 1 to maxDegree and the ladder is pruned
+    once the criterion has not improved by tol for patience degrees in a row.
+    Candidates that cannot be fitted (e.g. ExpReg on non-positive f(x)) are skipped.
+
     Args:
         reg (Reg): The regression object.
+        candidates (list[type[Reg]]|None, optional): Model classes to try.
+            Defaults to LinReg, QuadReg, CubReg, ExpReg and LogReg.
+        maxDegree (int, optional): Also try PolyReg of degree 1..maxDegree. Defaults to 0.
+        criterion (Literal["rsq","adjRsq","aic","bic"], optional): Selection criterion. Defaults to "rsq".
+        workers (int, optional): Fit the candidates in a pool of this size, 0 to fit in turn. Defaults to 0.
+        pool (Literal["thread","process"], optional): Pool type. Defaults to "thread".
+        patience (int, optional): Degrees without improvement before the PolyReg ladder stops. Defaults to 2.
+        tol (float, optional): Smallest criterion gain counted as improvement. Defaults to 1e-9.
         
     Returns:
-        Reg: The best fit regression line."""
+        Reg: The best fit regression line.
+
+    Raises:
+        ValueError: If no candidate could be fitted."""
     
-    regArr:list[Reg] = [LinReg(reg),QuadReg(reg),CubReg(reg),ExpReg(reg),LogReg(reg)]
-    return regArr[regArr.index(max(regArr,key=lambda x:x.rsq))]
+    if candidates is None:
+        candidates=[LinReg,QuadReg,CubReg,ExpReg,LogReg]
+    regArr:list[Reg]=[c(reg) for c in candidates]
+    deg=max([r._spec[0] for r in regArr if r._spec[1:]==("x","y")],default=0)
+    if deg and reg._online is None:
+        reg.moments(deg) #Highest order needed, so the candidates share one pass
+    futures=None
+    if workers and regArr:
+        from concurrent.futures import ProcessPoolExecutor,ThreadPoolExecutor
+        ex=(ProcessPoolExecutor if pool=="process" else ThreadPoolExecutor)(workers)
+        if pool=="process" and reg._online is None:
+            xa=np.asarray(reg.x,dtype=np.float64)
+            fa=np.asarray(reg.fx,dtype=np.float64)
+            futures=[ex.submit(_scoreData,type(r),xa,fa,criterion) for r in regArr]
+        else:
+            futures=[ex.submit(_score,r,criterion) for r in regArr]
+    best:tuple[float,Reg|None]=(float("nan"),None)
+    if maxDegree:
+        ladder=PolyReg(reg)
+        stall=0
+        for d in range(1,maxDegree+1):
+            ladder.degree=d
+            v=_score(ladder,criterion)
+            if v==v and not v<=best[0]+tol: #nan never wins
+                cand=PolyReg(reg,degree=d)
+                if "_orth" in ladder.__dict__:
+                    cand.__dict__["_orth"]=ladder._orth #Nested fits, the longer state serves every degree
+                best,stall=(v,cand),0
+            else:
+                stall+=1
+                if stall>=patience:
+                    break
+    scores=[f.result() for f in futures] if futures else [_score(r,criterion) for r in regArr]
+    if futures:
+        ex.shutdown()
+    for v,r in zip(scores,regArr):
+        if v==v and not v<=best[0]:
+            best=(v,r)
+    if best[1] is None:
+        raise ValueError("No candidate could be fitted")
+    return best[1]
+
+
+def _stackSolve(S:NDArray,T:NDArray,deg:int) -> NDArray:
+    """Stacked normal equation solve from power sums (m,2deg+1) and (m,deg+1), nan where singular FOR INTERNAL USE ONLY"""
+    r=np.arange(deg+1)
+    G=S[:,2*deg-np.add.outer(r,r)]
+    b=T[:,::-1]
+    try:
+        return np.linalg.solve(G,b[...,None])[...,0]
+    except np.linalg.LinAlgError:
+        coef=np.full(b.shape,np.nan)
+        for i in range(len(G)):
+            try:
+                coef[i]=np.linalg.solve(G[i],b[i])
+            except np.linalg.LinAlgError:
+                pass
+        return coef
+
+def batchFit(x:list[number]|NDArray,fx:list[list[number]]|NDArray,model:type["Reg"]|None=None,degree:int=1,offsets:list[int]|NDArray|None=None) -> tuple[NDArray,NDArray]:
+    """Fit one regression per series, all at once.
+
+    The power sums of every series are accumulated together and the normal equations
+    are solved as one stacked solve, without making a Reg object per series.
+
+    Args:
+        x (list[number]|NDArray): The x values, (n_points,) shared by every series or (n_series,n_points).
+            With offsets, the flat x values of all series one after another.
+        fx (list[list[number]]|NDArray): The f(x) values, (n_series,n_points) or flat with offsets.
+        model (type[Reg]|None, optional): The model class. Defaults to LinReg.
+        degree (int, optional): The degree when model is PolyReg. Defaults to 1.
+        offsets (list[int]|NDArray|None, optional): Ragged layout, series i is x[offsets[i]:offsets[i+1]].
+            Defaults to None.
+
+    Returns:
+        tuple[NDArray,NDArray]: Coefficients (n_series,degree+1) in solArray order and r^2 (n_series,).
+            Series whose fit is singular get nan.
+
+    Raises:
+        ValueError: If model is an NLReg, which has no power sum fit.
+    """
+    if model is None:
+        model=LinReg
+    if issubclass(model,NLReg):
+        raise ValueError("batchFit needs a polynomial model, fit NLReg models one by one")
+    deg,tx,ty=(degree,"x","y") if model is PolyReg else model._spec
+    fx=np.asarray(fx,dtype=np.float64)
+    if offsets is None:
+        fx=np.atleast_2d(fx)
+        x=np.broadcast_to(np.asarray(x,dtype=np.float64),fx.shape)
+        total=lambda a:a.sum(axis=-1)
+        spread=lambda a:a[:,None]
+    else:
+        off=np.asarray(offsets)
+        x=np.asarray(x,dtype=np.float64)
+        counts=np.diff(off)
+        total=lambda a:np.where(counts>0,np.add.reduceat(a,np.minimum(off[:-1],len(a)-1)),0.)
+        spread=lambda a:np.repeat(a,counts)
+    u=np.log(x) if tx=="logx" else x
+    v=np.log(fx) if ty=="logy" else fx
+    S=[]
+    T=[]
+    p=np.ones_like(u)
+    for k in range(2*deg+1):
+        S.append(total(p))
+        if k<=deg:T.append(total(p*v))
+        p=p*u
+    S=np.stack(S,axis=-1)
+    T=np.stack(T,axis=-1)
+    coef=_stackSolve(S,T,deg)
+    pred=0.
+    for c in coef.T:
+        pred=pred*u+spread(c)
+    if ty=="logy":pred=np.exp(pred)
+    e=fx-pred
+    n=S[:,0]
+    SStot=total(fx*fx)-total(fx)**2/n
+    return coef,1-total(e*e)/SStot
 
 
 class Reg:
@@ -28,6 +177,11 @@ class Reg:
     Should not be used directly, use the subclasses instead or make your own."""
     x:list[number]
     fx:list[number]
+    _mom:dict #Power sums shared by every Reg made from the same data, see moments
+    _cached:tuple[str,...] = ("solArray","rsq","adjRsq","residuals","rmse","leverage","stdErr","_cov","_sigma2","aic","bic","weights") #cached_property names dropped by clearCache
+    _spec:tuple[int,str,str] = (1,"x","y") #(degree, x transform, f(x) transform) of the fit, see moments
+    _online:float|None = None #Forgetting factor in online mode, None when fitting stored data
+    _robust:tuple[str,float]|None = None #(loss, tuning constant) of a robust fit, see robust
 
     def __init__(self,x:Union[list[number],"Reg"],fx:list[number]|None=None) -> None:
         """Initialise a regression object.
@@ -46,9 +200,12 @@ class Reg:
         if isinstance(x,Reg):
             self.x=x.x
             self.fx=x.fx
+            self._mom=x._mom
+            self._online=x._online
         elif len(x) == len(fx):
             self.x=x
             self.fx=fx
+            self._mom={}
         else:
             raise ValueError
 
@@ -110,20 +267,374 @@ class Reg:
         """
         self.x=reg.x
         self.fx=reg.fx
+        self._mom=reg._mom if reg is not self else {}
+        self._online=reg._online
+        self.clearCache()
         return self
 
-    @property
+    def clearCache(self):
+        """Drop the cached fit so it is recomputed on next access.
+
+        Returns:
+            Reg: The regression object.(self)
+        """
+        for i in self._cached:
+            self.__dict__.pop(i,None)
+        return self
+
+    @staticmethod
+    def online(deg:int=1,tx:Literal["x","logx"]="x",ty:Literal["y","logy"]="y",forget:float=1.):
+        """Regression object in online mode.
+
+        Only running power sums are kept, points are added with append and removed with remove.
+        x and fx stay empty, use the subclass online macros to get a fit.
+
+        Args:
+            deg (int, optional): The highest degree that will be fitted. Defaults to 1.
+            tx (Literal["x","logx"], optional): Transform of x. Defaults to "x".
+            ty (Literal["y","logy"], optional): Transform of f(x). Defaults to "y".
+            forget (float, optional): Exponential forgetting factor in (0,1]. Defaults to 1.
+                Each append weights the points before it by forget, for drifting signals.
+
+        Returns:
+            Reg: The regression object.
+        """
+        reg=Reg([],[])
+        reg._mom[(tx,ty)]=(np.zeros(2*deg+1),np.zeros(deg+1),np.zeros(1))
+        reg._online=forget
+        return reg
+
+    @staticmethod
+    def fromFile(path:str,deg:int=1,tx:Literal["x","logx"]="x",ty:Literal["y","logy"]="y",cols:tuple[int,int]=(0,1),delimiter:str|None=None,skip:int|None=None,chunk:int=1<<20):
+        """Regression object streamed from a CSV, TSV or .npy file.
+
+        The file is read chunk rows at a time into the running sums of an online regression,
+        so the points are never all in memory. More points can be added with append afterwards.
+
+        Args:
+            path (str): The file, .npy files are memory-mapped and must hold a 2D array.
+            deg (int, optional): The highest degree that will be fitted. Defaults to 1.
+            tx (Literal["x","logx"], optional): Transform of x. Defaults to "x".
+            ty (Literal["y","logy"], optional): Transform of f(x). Defaults to "y".
+            cols (tuple[int,int], optional): The x and f(x) columns. Defaults to (0,1).
+            delimiter (str|None, optional): Text delimiter. Defaults to None.
+                None is a tab for .tsv files and a comma otherwise.
+            skip (int|None, optional): Text lines to skip before the data. Defaults to None.
+                None skips the first line only if it is not numeric (a header).
+            chunk (int, optional): Rows read at a time. Defaults to 1<<20.
+
+        Returns:
+            Reg: The regression object, in online mode.
+        """
+        reg=Reg.online(deg,tx,ty)
+        for x,fx in _readChunks(path,cols,delimiter,skip,chunk):
+            reg.append(x,fx)
+        return reg
+
+    def append(self,x:number|list[number]|NDArray,fx:number|list[number]|NDArray):
+        """Add points to the running sums of an online regression, O(degree) per point.
+
+        Args:
+            x (number|list[number]|NDArray): The x value(s), later points are newer.
+            fx (number|list[number]|NDArray): The f(x) value(s).
+
+        Returns:
+            Reg: The regression object.(self)
+
+        Raises:
+            ValueError: If the object is not in online mode.
+        """
+        if self._online is None:
+            raise ValueError("append needs a regression made with online()")
+        x=np.atleast_1d(np.asarray(x,dtype=np.float64))
+        fx=np.atleast_1d(np.asarray(fx,dtype=np.float64))
+        w=self._online**np.arange(len(x)-1,-1,-1)
+        for (tx,ty),(S,T,Q) in self._mom.items():
+            u=np.log(x) if tx=="logx" else x
+            v=np.log(fx) if ty=="logy" else fx
+            p=np.vander(u,len(S),increasing=True)*w[:,None]
+            S*=self._online**len(x)
+            S+=p.sum(axis=0)
+            T*=self._online**len(x)
+            T+=v@p[:,:len(T)]
+            Q*=self._online**len(x)
+            Q+=(v*v)@w
+        self.clearCache()
+        return self
+
+    def remove(self,x:number|list[number]|NDArray,fx:number|list[number]|NDArray):
+        """Remove points from the running sums of an online regression.
+
+        Args:
+            x (number|list[number]|NDArray): The x value(s).
+            fx (number|list[number]|NDArray): The f(x) value(s).
+
+        Returns:
+            Reg: The regression object.(self)
+
+        Raises:
+            ValueError: If the object is not in online mode or uses forgetting,
+                as the weight of an old point is then unknown.
+        """
+        if self._online != 1:
+            raise ValueError("remove needs a regression made with online() without forgetting")
+        x=np.atleast_1d(np.asarray(x,dtype=np.float64))
+        fx=np.atleast_1d(np.asarray(fx,dtype=np.float64))
+        for (tx,ty),(S,T,Q) in self._mom.items():
+            u=np.log(x) if tx=="logx" else x
+            v=np.log(fx) if ty=="logy" else fx
+            p=np.vander(u,len(S),increasing=True)
+            S-=p.sum(axis=0)
+            T-=v@p[:,:len(T)]
+            Q-=v@v
+        self.clearCache()
+        return self
+
+    def moments(self,deg:int,tx:Literal["x","logx"]="x",ty:Literal["y","logy"]="y") -> tuple[NDArray,NDArray]:
+        """Power sums of the data, computed once and shared by every fit of the same data.
+
+        Args:
+            deg (int): The polynomial degree the sums are needed for.
+            tx (Literal["x","logx"], optional): Transform of x. Defaults to "x".
+            ty (Literal["y","logy"], optional): Transform of f(x). Defaults to "y".
+
+        Returns:
+            tuple[NDArray,NDArray]: S[k]=sum(u^k) for k=0..2deg and T[k]=sum(u^k*v) for k=0..deg
+                where u,v are the transformed x,f(x).
+
+        Raises:
+            ValueError: If an online regression does not track these sums.
+        """
+        key=(tx,ty)
+        if key not in self._mom or len(self._mom[key][1])<deg+1:
+            if self._online is not None:
+                raise ValueError(f"Online regression does not track degree {deg} sums of {key}")
+            u=np.asarray(self.x,dtype=np.float64)
+            v=np.asarray(self.fx,dtype=np.float64)
+            if tx=="logx":u=np.log(u)
+            if ty=="logy":v=np.log(v)
+            S=np.empty(2*deg+1)
+            T=np.empty(deg+1)
+            p=np.ones_like(u)
+            for k in range(2*deg+1):
+                S[k]=p.sum()
+                if k<=deg:T[k]=p@v
+                p=p*u
+            self._mom[key]=(S,T,np.array([v@v]))
+        S,T,_=self._mom[key]
+        return S[:2*deg+1],T[:deg+1]
+
+    def _polyFit(self,deg:int,tx:Literal["x","logx"]="x",ty:Literal["y","logy"]="y") -> NDArray:
+        """Least squares polynomial coefficients (highest power first) from the cached moments,
+        refined by _irls for a robust fit FOR INTERNAL USE ONLY"""
+        S,T=self.moments(deg,tx,ty)
+        r=np.arange(deg+1)
+        b=np.asarray(AugMat(S[2*deg-np.add.outer(r,r)],list(T[::-1])).asolve(),dtype=np.float64)
+        return b if self._robust is None else self._irls(b,deg,tx,ty)
+
+    def robust(self,loss:Literal["huber","tukey"]="huber",c:float|None=None):
+        """Robust version of this regression, fitted by iteratively reweighted least squares.
+
+        Starts from the least squares fit and downweights points with large residuals (scaled by their
+        median absolute value), each iteration being one weighted solve reusing the same matrix of powers.
+        tukey is started from the huber fit. The fit is done in the transformed space of the model
+        (e.g. ln(y) for ExpReg). stdErr, leverage and predInterval stay those of the unweighted fit.
+
+        Args:
+            loss (Literal["huber","tukey"], optional): The loss. Defaults to "huber".
+                huber still gives outliers some weight, tukey (bisquare) rejects them entirely.
+            c (float|None, optional): Tuning constant in scaled residuals. Defaults to None.
+                None is 1.345 for huber and 4.685 for tukey (95% efficiency on normal errors).
+
+        Returns:
+            Reg: A new regression object of the same class, weights holds the final point weights.
+
+        Raises:
+            ValueError: If the regression is online or nonlinear.
+        """
+        if self._online is not None or isinstance(self,NLReg):
+            raise ValueError("Robust fits need stored data and a polynomial model")
+        reg=copy(self).clearCache()
+        reg._robust=(loss,c if c is not None else {"huber":1.345,"tukey":4.685}[loss])
+        return reg
+
+    @staticmethod
+    def _lossWeights(r:NDArray,loss:str,c:float,w:NDArray|None=None) -> NDArray:
+        """IRLS weights of residuals r along the last axis, scaled by their median (weighted by the
+        point weights w of the same shape if given) FOR INTERNAL USE ONLY"""
+        a=np.abs(r)
+        n=a.shape[-1]
+        if w is None:
+            s=np.partition(a,n//2,axis=-1)[...,n//2,None] #Median, the intercept centres the residuals
+        else:
+            o=np.argsort(a,axis=-1)
+            cw=np.cumsum(np.take_along_axis(w,o,axis=-1),axis=-1)
+            i=(cw<=cw[...,-1:]/2).sum(axis=-1,keepdims=True)
+            s=np.take_along_axis(np.take_along_axis(a,o,axis=-1),np.minimum(i,n-1),axis=-1)
+        s=s/0.6745
+        with np.errstate(divide="ignore",invalid="ignore"):
+            z=a/(c*s)
+        if loss=="huber":
+            lw=1/np.maximum(z,1.)
+        else:
+            lw=np.where(z<1,(1-z*z)**2,0.)
+        return np.where(s==0,1.,lw)
+
+    def _irls(self,b:NDArray,deg:int,tx:str,ty:str,maxIter:int=100,tol:float=1e-9) -> NDArray:
+        """Robust coefficients by iteratively reweighted least squares from start b FOR INTERNAL USE ONLY"""
+        loss,c=self._robust
+        u=np.asarray(self.x,dtype=np.float64)
+        v=np.asarray(self.fx,dtype=np.float64)
+        if tx=="logx":u=np.log(u)
+        if ty=="logy":v=np.log(v)
+        P=np.vander(u,2*deg+1,increasing=True) #Powers for the weighted normal equations, built once
+        for step in (("huber",1.345),("tukey",c)) if loss=="tukey" else (("huber",c),):
+            for _ in range(maxIter):
+                w=self._lossWeights(v-horner(b,u),*step)
+                bn=_stackSolve((w@P)[None],((w*v)@P[:,:deg+1])[None],deg)[0]
+                done=np.abs(bn-b).max()<=tol*(np.abs(b).max()+tol)
+                b=bn
+                if done:
+                    break
+        return b
+
+    @cached_property
+    def weights(self) -> NDArray:
+        """Point weights of the fit, all 1 unless robust."""
+        if self._robust is None:
+            return np.ones(len(self.x))
+        u,v=self._data()
+        return self._lossWeights(v-horner(self.solArray,u),*self._robust)
+
+    def _data(self) -> tuple[NDArray,NDArray]:
+        """Stored data in the transformed space of the fit FOR INTERNAL USE ONLY"""
+        if self._online is not None:
+            raise ValueError("Online regression does not store the data")
+        _,tx,ty=self._spec
+        u=np.asarray(self.x,dtype=np.float64)
+        v=np.asarray(self.fx,dtype=np.float64)
+        return (np.log(u) if tx=="logx" else u),(np.log(v) if ty=="logy" else v)
+
+    @cached_property
+    def residuals(self) -> NDArray:
+        """f(x)-fitted f(x) for every point."""
+        return np.asarray(self.fx,dtype=np.float64)-self.f(self.x)
+
+    @cached_property
     def rsq(self) -> number:
         """The r^2 value of the regression line.
 
         Returns:
             number: The r^2 value.
+                In online mode it is computed from the running sums, in the transformed space of the fit.
+        """
+        if self._online is not None:
+            deg,tx,ty=self._spec
+            S,T=self.moments(deg,tx,ty)
+            Q=self._mom[(tx,ty)][2][0]
+            b=self.solArray[::-1]
+            r=np.arange(deg+1)
+            SSres=Q-2*b@T+b@S[np.add.outer(r,r)]@b
+            return 1-SSres/(Q-T[0]**2/S[0])
+        e=self.residuals
+        fx=np.asarray(self.fx,dtype=np.float64)
+        return 1-(e@e)/np.sum((fx-fx.mean())**2)
+
+    @cached_property
+    def adjRsq(self) -> number:
+        """The r^2 value adjusted for the number of coefficients."""
+        n=self.moments(0,*self._spec[1:])[0][0]
+        return 1-(1-self.rsq)*(n-1)/(n-self._spec[0]-1)
+
+    @cached_property
+    def rmse(self) -> number:
+        """Root mean square of the residuals."""
+        return float(np.sqrt(np.mean(self.residuals**2)))
+
+    @cached_property
+    def aic(self) -> number:
+        """Akaike information criterion, lower is better.
+        In online mode it is computed in the transformed space of the fit."""
+        n=self.moments(0,*self._spec[1:])[0][0]
+        return n*log(self._mse)+2*(self._spec[0]+1)
+
+    @cached_property
+    def bic(self) -> number:
+        """Bayesian information criterion, lower is better.
+        In online mode it is computed in the transformed space of the fit."""
+        n=self.moments(0,*self._spec[1:])[0][0]
+        return n*log(self._mse)+log(n)*(self._spec[0]+1)
+
+    @property
+    def _mse(self) -> number:
+        """Mean square residual FOR INTERNAL USE ONLY"""
+        if self._online is not None:
+            n=self.moments(0,*self._spec[1:])[0][0]
+            return self._sigma2*(n-self._spec[0]-1)/n
+        return self.rmse**2
+
+    @cached_property
+    def _cov(self) -> NDArray:
+        """Coefficient covariance per unit variance, solArray order FOR INTERNAL USE ONLY"""
+        deg,tx,ty=self._spec
+        S,_=self.moments(deg,tx,ty)
+        r=np.arange(deg+1)
+        return np.linalg.inv(S[2*deg-np.add.outer(r,r)])
+
+    @cached_property
+    def _sigma2(self) -> number:
+        """Residual variance in the transformed space of the fit FOR INTERNAL USE ONLY"""
+        deg,tx,ty=self._spec
+        S,T=self.moments(deg,tx,ty)
+        if self._online is not None:
+            Q=self._mom[(tx,ty)][2][0]
+            b=self.solArray[::-1]
+            r=np.arange(deg+1)
+            SSres=Q-2*b@T+b@S[np.add.outer(r,r)]@b
+        else:
+            u,v=self._data()
+            e=v-horner(self.solArray,u)
+            SSres=e@e
+        return SSres/(S[0]-deg-1)
+
+    @cached_property
+    def stdErr(self) -> NDArray:
+        """Standard errors of the coefficients, in solArray order and the transformed space of the fit."""
+        return np.sqrt(self._sigma2*np.diag(self._cov))
+
+    @cached_property
+    def leverage(self) -> NDArray:
+        """Leverage (hat matrix diagonal) of every point."""
+        u,_=self._data()
+        V=np.vander(u,self._spec[0]+1)
+        return np.einsum('ij,jk,ik->i',V,self._cov,V)
+
+    def predInterval(self,x:number|list[number]|NDArray,conf:float=0.95) -> tuple[number|NDArray,number|NDArray]:
+        """Prediction interval for new observations.
+
+        Args:
+            x (number|list[number]|NDArray): The x value(s).
+            conf (float, optional): The confidence level. Defaults to 0.95.
+
+        Returns:
+            tuple[number|NDArray,number|NDArray]: The lower and upper bounds.
         """
-        e=sub(self.fx,[self.f(i) for i in self.x])
-        SSres=sum(mul(e,e))
-        mean=sum(self.fx)/len(self.fx)
-        SStot=sum(mul(Stot:=sub(self.fx,[mean for i in self.fx]),Stot))
-        return 1-SSres/SStot
+        deg,tx,ty=self._spec
+        u=self._arr(x)
+        if tx=="logx":u=np.log(u)
+        V=np.vander(np.atleast_1d(u),deg+1)
+        h=np.einsum('ij,jk,ik->i',V,self._cov,V)
+        n=self.moments(0,tx,ty)[0][0]
+        w=TpApprox(n-deg-1,(1+conf)/2)*np.sqrt(self._sigma2*(1+h))
+        y=horner(self.solArray,np.atleast_1d(u))
+        lo,hi=y-w,y+w
+        if ty=="logy":lo,hi=np.exp(lo),np.exp(hi)
+        return (lo,hi) if np.ndim(u) else (lo[0],hi[0])
+
+    @staticmethod
+    def _arr(x:number|list[number]|NDArray) -> number|NDArray:
+        """Scalars as is, lists and arrays as float arrays FOR INTERNAL USE ONLY"""
+        return x if np.isscalar(x) else np.asarray(x,dtype=np.float64)
 
     @abstractmethod
     def f(self,x:number)->number:
@@ -141,6 +652,8 @@ class LinReg(Reg):
     
     In the form y = mx + c."""
 
+    _spec = (1,"x","y")
+
     def __repr__(self) -> str:
         return f"{self.x=}\n{self.fx=}\ny~{self.m}x{self.c:+}"
 
@@ -152,11 +665,17 @@ class LinReg(Reg):
     def lot(n:list[tuple[number,number]]):
         return LinReg(Reg.lot(n))
 
+    @staticmethod
+    def online(forget: float = 1.):
+        return LinReg(Reg.online(*LinReg._spec,forget=forget))
+
+    @staticmethod
+    def fromFile(path: str, cols: tuple[int,int] = (0,1), delimiter: str | None = None, skip: int | None = None, chunk: int = 1<<20):
+        return LinReg(Reg.fromFile(path,*LinReg._spec,cols=cols,delimiter=delimiter,skip=skip,chunk=chunk))
+
     @cached_property
     def solArray(self):
-        return AugMat(np.array([[sum(mul(self.x,self.x)),sum(self.x)]
-        ,[sum(self.x),len(self.x)]]),
-        [sum(mul(self.x,self.fx)),sum(self.fx)]).asolve()
+        return self._polyFit(*self._spec)
 
     @property
     def m(self) -> number:
@@ -166,26 +685,26 @@ class LinReg(Reg):
     def c(self) -> number:
         return self.solArray[1]
 
-    def f(self,x:number):
+    def f(self,x:number|list[number]|NDArray):
         """f(x) for the regression line.
         
         Args:
-            x (number): The x value.
+            x (number|list[number]|NDArray): The x value(s).
             
         Returns:
-            number: The f(x) value."""
-        return self.m*x+self.c
+            number|NDArray: The f(x) value(s)."""
+        return horner(self.solArray,x)
 
-    def xf(self,f:number):
+    def xf(self,f:number|list[number]|NDArray):
         """x for the regression line.
 
         Args:
-            f (number): The f(x) value.
+            f (number|list[number]|NDArray): The f(x) value(s).
 
         Returns:
-            number: The x value.
+            number|NDArray: The x value(s).
         """
-        return (f-self.c)/self.m
+        return (self._arr(f)-self.c)/self.m
 
 
 class QuadReg(Reg):
@@ -193,6 +712,8 @@ class QuadReg(Reg):
     
     In the form y = ax^2 + bx + c."""
 
+    _spec = (2,"x","y")
+
     def __repr__(self) -> str:
         return f"{self.x=}\n{self.fx=}\ny~{self.a}x^2{self.b:+}x{self.c:+}"
 
@@ -204,14 +725,17 @@ class QuadReg(Reg):
     def lot(n:list[tuple[number,number]]):
         return QuadReg(Reg.lot(n))
 
-    @property
+    @staticmethod
+    def online(forget: float = 1.):
+        return QuadReg(Reg.online(*QuadReg._spec,forget=forget))
+
+    @staticmethod
+    def fromFile(path: str, cols: tuple[int,int] = (0,1), delimiter: str | None = None, skip: int | None = None, chunk: int = 1<<20):
+        return QuadReg(Reg.fromFile(path,*QuadReg._spec,cols=cols,delimiter=delimiter,skip=skip,chunk=chunk))
+
+    @cached_property
     def solArray(self):
-        return AugMat(
-            np.array([[sum([i**4 for i in self.x]),sum([i**3 for i in self.x]),sum([i**2 for i in self.x])],
-            [sum([i**3 for i in self.x]),sum([i**2 for i in self.x]),sum(self.x)],
-            [sum([i**2 for i in self.x]),sum(self.x),len(self.x)]]),
-            [sum(mul([i**2 for i in self.x],self.fx)),sum(mul(self.x,self.fx)),sum(self.fx)]
-        ).asolve()
+        return self._polyFit(*self._spec)
 
     @property
     def a(self) -> number:
@@ -225,32 +749,34 @@ class QuadReg(Reg):
     def c(self) -> number:
         return self.solArray[2]
 
-    def f(self,x:number):
+    def f(self,x:number|list[number]|NDArray):
         """f(x) for the regression line.
         
         Args:
-            x (number): The x value.
+            x (number|list[number]|NDArray): The x value(s).
             
         Returns:
-            number: The f(x) value."""
-        return self.a*x**2+self.b*x+self.c
+            number|NDArray: The f(x) value(s)."""
+        return horner(self.solArray,x)
 
-    def xf(self,f:number):
+    def xf(self,f:number|list[number]|NDArray):
         """x for the regression line.
 
         Args:
-            f (number): The f(x) value.
+            f (number|list[number]|NDArray): The f(x) value(s).
 
         Returns:
-            list[complex]: The x values.
+            NDArray: The complex x values, one row per f(x) value for a list or array.
         """
-        return solvePoly(self.a,self.b,self.c-f)
+        return solvePolyArr(self.solArray,f)
 
 class CubReg(Reg):
     """Cubic Regression class.
     
     In the form y = ax^3 + bx^2 + cx + d."""
 
+    _spec = (3,"x","y")
+
     def __repr__(self) -> str:
         return f"{self.x=}\n{self.fx=}\ny~{self.a}x^3{self.b:+}x^2{self.c:+}x{self.d:+}"
 
@@ -262,15 +788,17 @@ class CubReg(Reg):
     def lot(n:list[tuple[number,number]]):
         return CubReg(Reg.lot(n))
 
-    @property
+    @staticmethod
+    def online(forget: float = 1.):
+        return CubReg(Reg.online(*CubReg._spec,forget=forget))
+
+    @staticmethod
+    def fromFile(path: str, cols: tuple[int,int] = (0,1), delimiter: str | None = None, skip: int | None = None, chunk: int = 1<<20):
+        return CubReg(Reg.fromFile(path,*CubReg._spec,cols=cols,delimiter=delimiter,skip=skip,chunk=chunk))
+
+    @cached_property
     def solArray(self):
-        return AugMat(
-            np.array([[sum([i**6 for i in self.x]),sum([i**5 for i in self.x]),sum([i**4 for i in self.x]),sum([i**3 for i in self.x])],
-            [sum([i**5 for i in self.x]),sum([i**4 for i in self.x]),sum([i**3 for i in self.x]),sum([i**2 for i in self.x])],
-            [sum([i**4 for i in self.x]),sum([i**3 for i in self.x]),sum([i**2 for i in self.x]),sum(self.x)],
-            [sum([i**3 for i in self.x]),sum([i**2 for i in self.x]),sum(self.x),len(self.x)]]),
-            [sum(mul([i**3 for i in self.x],self.fx)),sum(mul([i**2 for i in self.x],self.fx)),sum(mul(self.x,self.fx)),sum(self.fx)]
-        ).asolve()
+        return self._polyFit(*self._spec)
 
     @property
     def a(self) -> number:
@@ -288,33 +816,35 @@ class CubReg(Reg):
     def d(self) -> number:
         return self.solArray[3]
 
-    def f(self,x:number):
+    def f(self,x:number|list[number]|NDArray):
         """f(x) for the regression line.
 
         Args:
-            x (number): The x value.
+            x (number|list[number]|NDArray): The x value(s).
 
         Returns:
-            number: The f(x) value."""
+            number|NDArray: The f(x) value(s)."""
 
-        return self.a*x**3+self.b*x**2+self.c*x+self.d 
+        return horner(self.solArray,x)
 
-    def xf(self,f:number):
+    def xf(self,f:number|list[number]|NDArray):
         """x for the regression line.
 
         Args:
-            f (number): The f(x) value.
+            f (number|list[number]|NDArray): The f(x) value(s).
 
         Returns:
-            list[complex]: The x values.
+            NDArray: The complex x values, one row per f(x) value for a list or array.
         """
-        return solvePoly(self.a,self.b,self.c,self.d-f)
+        return solvePolyArr(self.solArray,f)
 
 class ExpReg(Reg):
     """Exponential Regression class.
     
     In the form y = ae^(bx)."""
 
+    _spec = (1,"x","logy")
+
     def __repr__(self) -> str:
         return f"{self.x=}\n{self.fx=}\ny~{self.a}e^({self.b}x)"
 
@@ -326,17 +856,21 @@ class ExpReg(Reg):
     def lot(n:list[tuple[number,number]]):
         return ExpReg(Reg.lot(n))
 
+    @staticmethod
+    def online(forget: float = 1.):
+        return ExpReg(Reg.online(*ExpReg._spec,forget=forget))
+
+    @staticmethod
+    def fromFile(path: str, cols: tuple[int,int] = (0,1), delimiter: str | None = None, skip: int | None = None, chunk: int = 1<<20):
+        return ExpReg(Reg.fromFile(path,*ExpReg._spec,cols=cols,delimiter=delimiter,skip=skip,chunk=chunk))
+
     @property
     def logfx(self):
         return [log(i) for i in self.fx]
 
-    @property
+    @cached_property
     def solArray(self):
-        return AugMat(
-            np.array([[sum([i**2 for i in self.x]),sum(self.x)],
-            [sum(self.x),len(self.x)]]),
-            [sum(mul(self.x,self.logfx)),sum(self.logfx)]
-        ).asolve()
+        return self._polyFit(*self._spec)
 
     @property
     def b(self) -> number:
@@ -346,33 +880,35 @@ class ExpReg(Reg):
     def a(self) -> number:
         return exp(self.solArray[1])
 
-    def f(self,x:number):
+    def f(self,x:number|list[number]|NDArray):
         """f(x) for the regression line.
 
         Args:
-            x (number): The x value.
+            x (number|list[number]|NDArray): The x value(s).
 
         Returns:
-            number: The f(x) value."""
+            number|NDArray: The f(x) value(s)."""
 
-        return self.a*exp(self.b*x)
+        return self.a*np.exp(self.b*self._arr(x))
 
-    def xf(self,f:number):
+    def xf(self,f:number|list[number]|NDArray):
         """x for the regression line.
 
         Args:
-            f (number): The f(x) value.
+            f (number|list[number]|NDArray): The f(x) value(s).
 
         Returns:
-            number: The x value.
+            number|NDArray: The x value(s).
         """
-        return log(f/self.a)/self.b
+        return np.log(self._arr(f)/self.a)/self.b
 
 class LogReg(Reg):
     """Logarithmic Regression class.
 
     In the form y = a*ln(x) + b."""
 
+    _spec = (1,"logx","y")
+
     def __repr__(self) -> str:
         return f"{self.x=}\n{self.fx=}\ny~{self.a}ln(x)+{self.b}"
 
@@ -388,13 +924,17 @@ class LogReg(Reg):
     def logx(self):
         return [log(i) for i in self.x]
 
-    @property
+    @staticmethod
+    def online(forget: float = 1.):
+        return LogReg(Reg.online(*LogReg._spec,forget=forget))
+
+    @staticmethod
+    def fromFile(path: str, cols: tuple[int,int] = (0,1), delimiter: str | None = None, skip: int | None = None, chunk: int = 1<<20):
+        return LogReg(Reg.fromFile(path,*LogReg._spec,cols=cols,delimiter=delimiter,skip=skip,chunk=chunk))
+
+    @cached_property
     def solArray(self):
-        return AugMat(
-            np.array([[sum([i**2 for i in self.logx]),sum(self.logx)],
-            [sum(self.logx),len(self.logx)]]),
-            [sum(mul(self.logx,self.fx)),sum(self.fx)]
-        ).asolve()
+        return self._polyFit(*self._spec)
 
     @property
     def a(self) -> number:
@@ -404,79 +944,480 @@ class LogReg(Reg):
     def b(self) -> number:
         return self.solArray[1]
 
-    def f(self,x:number):
+    def f(self,x:number|list[number]|NDArray):
         """f(x) for the regression line.
 
         Args:
-            x (number): The x value.
+            x (number|list[number]|NDArray): The x value(s).
 
         Returns:
-            number: The f(x) value."""
-        return self.a*log(x)+self.b
+            number|NDArray: The f(x) value(s)."""
+        return self.a*np.log(self._arr(x))+self.b
+
+    def xf(self,f:number|list[number]|NDArray):
+        """x for the regression line.
+
+        Args:
+            f (number|list[number]|NDArray): The f(x) value(s).
+
+        Returns:
+            number|NDArray: The x value(s).
+        """
+        return np.exp((self._arr(f)-self.b)/self.a)
+
+class PowReg(Reg):
+    """Power Regression class.
+
+    In the form y = ax^b."""
+    _spec = (1,"logx","logy")
+
+    def __repr__(self) -> str:
+        return f"{self.x=}\n{self.fx=}\ny~{self.a}x^{self.b}"
+
+    @staticmethod
+    def make(n: int = 0, eval: bool = False, env: dict | None = None):
+        return PowReg(Reg.make(n,eval,env))
+
+    @staticmethod
+    def lot(n:list[tuple[number,number]]):
+        return PowReg(Reg.lot(n))
+
+    @staticmethod
+    def online(forget: float = 1.):
+        return PowReg(Reg.online(*PowReg._spec,forget=forget))
+
+    @staticmethod
+    def fromFile(path: str, cols: tuple[int,int] = (0,1), delimiter: str | None = None, skip: int | None = None, chunk: int = 1<<20):
+        return PowReg(Reg.fromFile(path,*PowReg._spec,cols=cols,delimiter=delimiter,skip=skip,chunk=chunk))
+
+    @cached_property
+    def solArray(self):
+        return self._polyFit(*self._spec)
+
+    @property
+    def b(self) -> number:
+        return self.solArray[0]
+
+    @property
+    def a(self) -> number:
+        return exp(self.solArray[1])
+
+    def f(self,x:number|list[number]|NDArray):
+        """f(x) for the regression line.
+
+        Args:
+            x (number|list[number]|NDArray): The x value(s).
+
+        Returns:
+            number|NDArray: The f(x) value(s)."""
+        return self.a*self._arr(x)**self.b
 
-    def xf(self,f:number):
+    def xf(self,f:number|list[number]|NDArray):
         """x for the regression line.
 
         Args:
-            f (number): The f(x) value.
+            f (number|list[number]|NDArray): The f(x) value(s).
+
+        Returns:
+            number|NDArray: The x value(s).
+        """
+        return (self._arr(f)/self.a)**(1/self.b)
+
+def _readChunks(path:str,cols:tuple[int,int],delimiter:str|None,skip:int|None,chunk:int) -> Iterable[tuple[NDArray,NDArray]]:
+    """x and f(x) columns of a CSV, TSV or .npy file, chunk rows at a time (see Reg.fromFile) FOR INTERNAL USE ONLY"""
+    path=str(path)
+    if path.endswith(".npy"):
+        a=np.load(path,mmap_mode="r")
+        for i in range(0,len(a),chunk):
+            b=a[i:i+chunk]
+            yield b[:,cols[0]],b[:,cols[1]]
+        return
+    if delimiter is None:
+        delimiter="\t" if path.endswith(".tsv") else ","
+    with open(path) as f:
+        lines=[]
+        if skip is None:
+            first=f.readline()
+            try:
+                np.loadtxt([first],delimiter=delimiter,usecols=cols)
+                lines=[first]
+            except ValueError:
+                pass
+        else:
+            for _ in range(skip):
+                f.readline()
+        while True:
+            lines+=islice(f,chunk-len(lines))
+            if not lines:
+                return
+            a=np.loadtxt(lines,delimiter=delimiter,usecols=cols,ndmin=2)
+            if len(a):
+                yield a[:,0],a[:,1]
+            lines=[]
+
+class NLReg(Reg):
+    """Base nonlinear least squares Regression class template.
+
+    Subclasses give the model, its Jacobian and a warm start, the parameters are then refined
+    with levMar so the error is minimised in f(x) itself rather than in a linearised form.
+    Diagnostics use the Jacobian at the solution. Needs the stored data, there is no online mode
+    (online raises TypeError and fromFile reads every point into memory)."""
+    _spec = (1,"x","y")
+    _cached = Reg._cached+("_nls",)
+
+    @staticmethod
+    def online(forget: float = 1.):
+        raise TypeError("Nonlinear regressions need the stored data, there is no online mode")
+
+    @staticmethod
+    def _readFile(path: str, cols: tuple[int,int], delimiter: str | None, skip: int | None, chunk: int) -> tuple[list[number],list[number]]:
+        """All x and f(x) values of a file, for the subclass fromFile FOR INTERNAL USE ONLY"""
+        x:list[number]=[]
+        fx:list[number]=[]
+        for u,v in _readChunks(path,cols,delimiter,skip,chunk):
+            x+=np.asarray(u,dtype=np.float64).tolist()
+            fx+=np.asarray(v,dtype=np.float64).tolist()
+        return x,fx
+
+    @abstractmethod
+    def _model(self,x:NDArray,p:NDArray) -> NDArray:
+        """Model at x for parameters p FOR INTERNAL USE ONLY"""
+
+    @abstractmethod
+    def _jac(self,x:NDArray,p:NDArray) -> NDArray:
+        """(len(x),len(p)) Jacobian of _model FOR INTERNAL USE ONLY"""
+
+    @abstractmethod
+    def _start(self) -> NDArray:
+        """Warm start parameters FOR INTERNAL USE ONLY"""
+
+    @cached_property
+    def _nls(self) -> tuple[NDArray,int]:
+        """levMar result FOR INTERNAL USE ONLY"""
+        return levMar(self._model,self._jac,self._start(),np.asarray(self.x,dtype=np.float64),np.asarray(self.fx,dtype=np.float64))
+
+    @cached_property
+    def solArray(self):
+        return self._nls[0]
+
+    @property
+    def iterations(self) -> int:
+        """Levenberg-Marquardt iterations used by the fit."""
+        return self._nls[1]
+
+    @cached_property
+    def _sigma2(self) -> number:
+        """Residual variance FOR INTERNAL USE ONLY"""
+        e=self.residuals
+        return e@e/(len(e)-len(self.solArray))
+
+    @cached_property
+    def _cov(self) -> NDArray:
+        """Parameter covariance per unit variance FOR INTERNAL USE ONLY"""
+        J=self._jac(np.asarray(self.x,dtype=np.float64),self.solArray)
+        return np.linalg.inv(J.T@J)
+
+    @cached_property
+    def stdErr(self) -> NDArray:
+        """Standard errors of the parameters, in solArray order."""
+        return np.sqrt(self._sigma2*np.diag(self._cov))
+
+    @cached_property
+    def leverage(self) -> NDArray:
+        """Leverage (hat matrix diagonal) of every point, from the Jacobian."""
+        J=self._jac(np.asarray(self.x,dtype=np.float64),self.solArray)
+        return np.einsum('ij,jk,ik->i',J,self._cov,J)
+
+    def predInterval(self,x:number|list[number]|NDArray,conf:float=0.95) -> tuple[number|NDArray,number|NDArray]:
+        """Prediction interval for new observations, linearised at the solution.
+
+        Args:
+            x (number|list[number]|NDArray): The x value(s).
+            conf (float, optional): The confidence level. Defaults to 0.95.
 
         Returns:
-            number: The x value.
+            tuple[number|NDArray,number|NDArray]: The lower and upper bounds.
         """
-        return exp((f-self.b)/self.a)
+        u=np.atleast_1d(self._arr(x))
+        J=self._jac(u,self.solArray)
+        h=np.einsum('ij,jk,ik->i',J,self._cov,J)
+        w=TpApprox(len(self.x)-len(self.solArray),(1+conf)/2)*np.sqrt(self._sigma2*(1+h))
+        y=self._model(u,self.solArray)
+        return (y-w,y+w) if np.ndim(x) else (y[0]-w[0],y[0]+w[0])
+
+    def _logStart(self,tx:Literal["x","logx"]) -> NDArray:
+        """[a,b] of the linearised fit of ln(|f(x)|) on the points sharing the sign of most f(x) FOR INTERNAL USE ONLY"""
+        y=np.asarray(self.fx,dtype=np.float64)
+        if (y>0).all():
+            b,lna=self._polyFit(1,tx,"logy")
+            return np.array([exp(lna),b])
+        s=1. if y.sum()>=0 else -1.
+        m=s*y>0
+        b,lna=Reg(list(np.asarray(self.x,dtype=np.float64)[m]),list(s*y[m]))._polyFit(1,tx,"logy")
+        return np.array([s*exp(lna),b])
+
+class ExpNLReg(NLReg,ExpReg):
+    """Exponential Regression class fitted by nonlinear least squares.
+
+    In the form y = ae^(bx), solArray is [a,b].
+    Warm started from the ExpReg fit, f(x) may be zero or negative."""
+
+    @staticmethod
+    def make(n: int = 0, eval: bool = False, env: dict | None = None):
+        return ExpNLReg(Reg.make(n,eval,env))
+
+    @staticmethod
+    def lot(n:list[tuple[number,number]]):
+        return ExpNLReg(Reg.lot(n))
+
+    @staticmethod
+    def fromFile(path: str, cols: tuple[int,int] = (0,1), delimiter: str | None = None, skip: int | None = None, chunk: int = 1<<20):
+        """Fit to the points of a CSV, TSV or .npy file (see Reg.fromFile), all read into memory."""
+        return ExpNLReg(*NLReg._readFile(path,cols,delimiter,skip,chunk))
+
+    @property
+    def a(self) -> number:
+        return self.solArray[0]
+
+    @property
+    def b(self) -> number:
+        return self.solArray[1]
+
+    def _model(self,x:NDArray,p:NDArray) -> NDArray:
+        return p[0]*np.exp(p[1]*x)
+
+    def _jac(self,x:NDArray,p:NDArray) -> NDArray:
+        e=np.exp(p[1]*x)
+        return np.column_stack([e,p[0]*x*e])
+
+    def _start(self) -> NDArray:
+        return self._logStart("x")
+
+class PowNLReg(NLReg,PowReg):
+    """Power Regression class fitted by nonlinear least squares.
+
+    In the form y = ax^b, solArray is [a,b].
+    Warm started from the PowReg fit, f(x) may be zero or negative."""
+
+    @staticmethod
+    def make(n: int = 0, eval: bool = False, env: dict | None = None):
+        return PowNLReg(Reg.make(n,eval,env))
+
+    @staticmethod
+    def lot(n:list[tuple[number,number]]):
+        return PowNLReg(Reg.lot(n))
+
+    @staticmethod
+    def fromFile(path: str, cols: tuple[int,int] = (0,1), delimiter: str | None = None, skip: int | None = None, chunk: int = 1<<20):
+        """Fit to the points of a CSV, TSV or .npy file (see Reg.fromFile), all read into memory."""
+        return PowNLReg(*NLReg._readFile(path,cols,delimiter,skip,chunk))
+
+    @property
+    def a(self) -> number:
+        return self.solArray[0]
+
+    @property
+    def b(self) -> number:
+        return self.solArray[1]
+
+    def _model(self,x:NDArray,p:NDArray) -> NDArray:
+        return p[0]*x**p[1]
+
+    def _jac(self,x:NDArray,p:NDArray) -> NDArray:
+        e=x**p[1]
+        return np.column_stack([e,p[0]*e*np.log(x)])
+
+    def _start(self) -> NDArray:
+        return self._logStart("logx")
 
 class PolyReg(Reg):
+    """Polynomial Regression class.
 
+    In the form y = a0x^n + a1x^(n-1) + ... + an.
 
+    Fitted with polynomials orthogonal over the data (three term recurrence on x scaled to [-1,1]),
+    so high degrees stay well conditioned and raising the degree only adds terms to the previous fit."""
+    _cached = Reg._cached+("_orth",)
 
     def __init__(self, x: list[number] | Reg, fx: list[number] | None = None,degree : int = 1) -> None:
         super().__init__(x, fx)
         self.degree = degree
 
     @staticmethod
-    def make(n: int = 0, eval: bool = False, env: dict | None = None):
-        return LogReg(Reg.make(n,eval,env))
+    def make(n: int = 0, eval: bool = False, env: dict | None = None, degree: int = 1):
+        return PolyReg(Reg.make(n,eval,env),degree=degree)
 
     @staticmethod
-    def lot(n:list[tuple[number,number]]):
-        return LogReg(Reg.lot(n))
-    
+    def lot(n:list[tuple[number,number]], degree: int = 1):
+        return PolyReg(Reg.lot(n),degree=degree)
+
+    @staticmethod
+    def online(forget: float = 1., degree: int = 1):
+        return PolyReg(Reg.online(degree,forget=forget),degree=degree)
+
+    @staticmethod
+    def fromFile(path: str, cols: tuple[int,int] = (0,1), delimiter: str | None = None, skip: int | None = None, chunk: int = 1<<20, degree: int = 1):
+        return PolyReg(Reg.fromFile(path,degree,cols=cols,delimiter=delimiter,skip=skip,chunk=chunk),degree=degree)
+
+    @property
+    def _spec(self):
+        return (self.degree,"x","y")
+
+    @property
+    def degree(self) -> int:
+        return self._degree
+
+    @degree.setter
+    def degree(self, degree: int):
+        self._degree = degree
+        for i in self._cached:
+            if i!="_orth":
+                self.__dict__.pop(i,None)
+
+    @cached_property
+    def _orth(self) -> dict:
+        """Orthogonal polynomial fit state FOR INTERNAL USE ONLY
+
+        t=(x-m)/h, p[k+1]=(t-a[k])p[k]-b[k]p[k-1], y~sum(c[k]p[k]), nn[k]=<p[k],p[k]>,
+        p holds the last two p[k] at the data and r the residual of the current fit."""
+        x=np.asarray(self.x,dtype=np.float64)
+        y=np.asarray(self.fx,dtype=np.float64)
+        m=(x.max()+x.min())/2
+        h=(x.max()-x.min())/2 or 1.
+        nn=float(len(x))
+        c=float(y.sum())/nn
+        return {"t":(x-m)/h,"m":m,"h":h,"a":[],"b":[],"c":[c],"nn":[nn],"p":[np.zeros_like(x),np.ones_like(x)],"r":y-c}
+
+    def _fit(self, deg: int) -> dict:
+        """Extend the orthogonal fit up to degree deg FOR INTERNAL USE ONLY"""
+        o=self._orth
+        t=o["t"]
+        while len(o["c"])<=deg:
+            k=len(o["c"])-1
+            q,p=o["p"]
+            a=float((t*p)@p)/o["nn"][k]
+            b=o["nn"][k]/o["nn"][k-1] if k else 0.
+            q=(t-a)*p-b*q
+            nn=float(q@q)
+            c=float(o["r"]@q)/nn
+            o["r"]=o["r"]-c*q
+            o["a"].append(a); o["b"].append(b); o["c"].append(c); o["nn"].append(nn)
+            o["p"]=[p,q]
+        return o
+
+    def _basis(self) -> NDArray:
+        """Monomial coefficients (highest power first) of each orthogonal polynomial, one column each FOR INTERNAL USE ONLY"""
+        deg=self.degree
+        o=self._fit(deg)
+        P=np.polynomial.Polynomial
+        q,p=P([0.]),P([1.])
+        t=P([-o["m"]/o["h"],1/o["h"]])
+        L=np.zeros((deg+1,deg+1))
+        for k in range(deg+1):
+            coef=p(t).coef
+            L[deg+1-len(coef):,k]=coef[::-1]
+            if k<deg:
+                q,p=p,P([-o["a"][k],1.])*p-o["b"][k]*q
+        return L
+
+    @property
+    def _monomial(self) -> bool:
+        """Fit from the monomial normal equations instead of the orthogonal recurrence FOR INTERNAL USE ONLY"""
+        return self._online is not None or self._robust is not None
+
     @cached_property
     def solArray(self):
-        deg = self.degree
+        if self._monomial:
+            return self._polyFit(*self._spec)
+        return self._basis()@np.array(self._fit(self.degree)["c"][:self.degree+1])
 
+    @cached_property
+    def _cov(self) -> NDArray:
+        """Coefficient covariance per unit variance, solArray order FOR INTERNAL USE ONLY"""
+        if self._monomial:
+            return Reg._cov.func(self)
+        L=self._basis()
+        return L@np.diag(1/np.array(self._fit(self.degree)["nn"][:self.degree+1]))@L.T
+
+    def _hat(self,t:NDArray) -> NDArray:
+        """sum(p[k](t)^2/nn[k]), the leverage of scaled x values t FOR INTERNAL USE ONLY"""
+        deg=self.degree
+        o=self._fit(deg)
+        q,p=np.zeros_like(t),np.ones_like(t)
+        h=p*p/o["nn"][0]
+        for k in range(deg):
+            q,p=p,(t-o["a"][k])*p-o["b"][k]*q
+            h+=p*p/o["nn"][k+1]
+        return h
+
+    @cached_property
+    def leverage(self) -> NDArray:
+        """Leverage (hat matrix diagonal) of every point."""
+        if self._monomial:
+            return Reg.leverage.func(self)
+        return self._hat(self._fit(self.degree)["t"])
+
+    @cached_property
+    def _sigma2(self) -> number:
+        """Residual variance FOR INTERNAL USE ONLY"""
+        if self._monomial:
+            return Reg._sigma2.func(self)
+        e=self.residuals
+        return float(e@e)/(len(e)-self.degree-1)
+
+    def predInterval(self,x:number|list[number]|NDArray,conf:float=0.95) -> tuple[number|NDArray,number|NDArray]:
+        """Prediction interval for new observations, from the orthogonal basis.
+
+        Args:
+            x (number|list[number]|NDArray): The x value(s).
+            conf (float, optional): The confidence level. Defaults to 0.95.
+
+        Returns:
+            tuple[number|NDArray,number|NDArray]: The lower and upper bounds.
+        """
+        if self._monomial:
+            return Reg.predInterval(self,x,conf)
+        deg=self.degree
+        o=self._fit(deg)
+        u=np.atleast_1d(np.asarray(x,dtype=np.float64))
+        h=self._hat((u-o["m"])/o["h"])
+        w=TpApprox(len(self.x)-deg-1,(1+conf)/2)*np.sqrt(self._sigma2*(1+h))
+        y=self.f(u)
+        lo,hi=y-w,y+w
+        return (lo,hi) if np.ndim(x) else (lo[0],hi[0])
 
-        return AugMat(
-            np.array(
-                [[sum(i**(2*deg-j-k) for i in self.x) for j in range(deg+1)] for k in range(deg+1)]
-            ),
-            [sum(mul([i**(deg-j) for i in self.x],self.fx)) for j in range(deg+1)]
-        ).asolve()
-    
     @property
     def coeffs(self):
         return self.solArray
     
-    def f(self,x:number):
+    def f(self,x:number|list[number]|NDArray):
         """f(x) for the regression line.
 
         Args:
-            x (number): The x value.
+            x (number|list[number]|NDArray): The x value(s).
 
         Returns:
-            number: The f(x) value."""
-        return sum(self.coeffs[i]*x**(self.degree-i) for i in range(self.degree+1))
+            number|NDArray: The f(x) value(s)."""
+        deg=self.degree
+        if self._monomial:
+            return horner(self.coeffs,x)
+        o=self._fit(deg)
+        t=(self._arr(x)-o["m"])/o["h"]
+        u1=u2=0.
+        for k in range(deg,-1,-1): #Clenshaw on the orthogonal basis
+            u1,u2=o["c"][k]+((t-o["a"][k])*u1 if k<deg else 0.)-(o["b"][k+1]*u2 if k+1<deg else 0.),u1
+        return u1
     
-    def xf(self,f:number):
+    def xf(self,f:number|list[number]|NDArray):
         """x for the regression line.
 
         Args:
-            f (number): The f(x) value.
+            f (number|list[number]|NDArray): The f(x) value(s).
 
         Returns:
-            number: The x value.
+            NDArray: The complex x values, one row per f(x) value for a list or array.
         """
-        return solvePoly(*self.coeffs,f)
+        return solvePolyArr(self.coeffs,f)
     
     def __repr__(self) -> str:
 
@@ -485,4 +1426,278 @@ class PolyReg(Reg):
     def __str__(self) -> str:
         return self.__repr__()
     
-    
\ No newline at end of file
+    
+
+class MultiReg:
+    """Multiple Linear Regression class.
+
+    In the form y = b0x0 + b1x1 + ... + c, fitted by weighted least squares with optional ridge.
+
+    Rows are accumulated chunk by chunk, only (features+1)^2 numbers are kept so any number of rows
+    can stream through. cholesky keeps X'WX and X'Wy, qr keeps the triangular factor of the
+    augmented [X|y] (slower, but does not square the condition number)."""
+    n:number #Sum of weights
+    _cached = ("solArray","rsq","adjRsq")
+
+    def __repr__(self) -> str:
+        return f"y~{''.join(f'{b:+}x{i}' for i,b in enumerate(self.coeffs))}{self.c:+}"
+
+    def __init__(self,X:list[list[number]]|NDArray|None=None,fx:list[number]|NDArray|None=None,w:list[number]|NDArray|None=None,intercept:bool=True,ridge:float=0.,method:Literal["cholesky","qr"]="cholesky") -> None:
+        """Initialise a multiple regression object.
+
+        Args:
+            X (list[list[number]]|NDArray|None, optional): First chunk of rows (n_rows,n_features). Defaults to None.
+            fx (list[number]|NDArray|None, optional): f(x) of the rows. Defaults to None.
+            w (list[number]|NDArray|None, optional): Weights of the rows. Defaults to 1.
+            intercept (bool, optional): Fit the constant c. Defaults to True.
+            ridge (float, optional): Ridge penalty on the coefficients (not c). Defaults to 0.
+            method (Literal["cholesky","qr"], optional): Accumulation and solve method. Defaults to "cholesky".
+        """
+        self.intercept=intercept
+        self.ridge=ridge
+        self.method=method
+        self.n=0.
+        self._G:NDArray|None=None #X'WX (cholesky) or R of [X|y] (qr)
+        self._b:NDArray|None=None #X'Wy (cholesky)
+        self._y=np.zeros(3) #sum(w), sum(w*y), sum(w*y^2)
+        self.rows=0
+        if X is not None and fx is not None:
+            self.append(X,fx,w)
+
+    @staticmethod
+    def stream(chunks:Iterable[tuple],intercept:bool=True,ridge:float=0.,method:Literal["cholesky","qr"]="cholesky") -> "MultiReg":
+        """Multiple regression object from an iterable of chunks.
+
+        Args:
+            chunks (Iterable[tuple]): (X,fx) or (X,fx,w) chunks, e.g. a generator reading a file.
+            intercept (bool, optional): Fit the constant c. Defaults to True.
+            ridge (float, optional): Ridge penalty on the coefficients. Defaults to 0.
+            method (Literal["cholesky","qr"], optional): Accumulation and solve method. Defaults to "cholesky".
+
+        Returns:
+            MultiReg: The regression object.
+        """
+        reg=MultiReg(intercept=intercept,ridge=ridge,method=method)
+        for i in chunks:
+            reg.append(*i)
+        return reg
+
+    def append(self,X:list[list[number]]|NDArray,fx:list[number]|NDArray,w:list[number]|NDArray|None=None):
+        """Accumulate a chunk of rows.
+
+        Args:
+            X (list[list[number]]|NDArray): Rows (n_rows,n_features).
+            fx (list[number]|NDArray): f(x) of the rows.
+            w (list[number]|NDArray|None, optional): Weights of the rows. Defaults to 1.
+
+        Returns:
+            MultiReg: The regression object.(self)
+        """
+        X=np.asarray(X,dtype=np.float64)
+        X=X.reshape(len(X),-1)
+        y=np.asarray(fx,dtype=np.float64)
+        w=np.ones(len(y)) if w is None else np.asarray(w,dtype=np.float64)
+        if self.intercept:
+            X=np.column_stack([X,np.ones(len(X))])
+        self._y+=[w.sum(),w@y,w@(y*y)]
+        self.n=self._y[0]
+        self.rows+=len(y)
+        if self.method=="qr":
+            sw=np.sqrt(w)
+            A=np.column_stack([X*sw[:,None],y*sw])
+            if self._G is not None:
+                A=np.vstack([self._G,A])
+            self._G=np.linalg.qr(A,mode="r")
+        else:
+            G=X.T@(X*w[:,None])
+            b=X.T@(w*y)
+            self._G=G if self._G is None else self._G+G
+            self._b=b if self._b is None else self._b+b
+        for i in self._cached:
+            self.__dict__.pop(i,None)
+        return self
+
+    @property
+    def features(self) -> int:
+        """Number of features (without the constant)."""
+        return (self._G.shape[1]-(self.method=="qr"))-self.intercept #type:ignore
+
+    @cached_property
+    def solArray(self) -> NDArray:
+        p=self.features+self.intercept
+        D=np.eye(p)
+        if self.intercept:
+            D[-1,-1]=0
+        if self.method=="qr":
+            R=self._G[:p,:p] #type:ignore
+            z=self._G[:p,p] #type:ignore
+            if self.ridge:
+                Q,R=np.linalg.qr(np.vstack([R,np.sqrt(self.ridge)*D]))
+                z=Q.T@np.r_[z,np.zeros(p)]
+            return np.linalg.solve(R,z)
+        G=self._G+self.ridge*D #type:ignore
+        try:
+            L=np.linalg.cholesky(G)
+            return np.linalg.solve(L.T,np.linalg.solve(L,self._b))
+        except np.linalg.LinAlgError:
+            return np.linalg.lstsq(G,self._b,rcond=None)[0]
+
+    @property
+    def coeffs(self) -> NDArray:
+        """Coefficients of the features."""
+        return self.solArray[:self.features]
+
+    @property
+    def c(self) -> number:
+        """The constant, 0 without intercept."""
+        return self.solArray[-1] if self.intercept else 0.
+
+    def f(self,X:list[number]|list[list[number]]|NDArray):
+        """f(x) for the regression.
+
+        Args:
+            X (list[number]|list[list[number]]|NDArray): One row (n_features,) or rows (n_rows,n_features).
+
+        Returns:
+            number|NDArray: The f(x) value(s).
+        """
+        return np.asarray(X,dtype=np.float64)@self.coeffs+self.c
+
+    @cached_property
+    def rsq(self) -> number:
+        """The weighted r^2 value of the regression, from the accumulated sums."""
+        sw,swy,swyy=self._y
+        b=self.solArray
+        if self.method=="qr":
+            p=len(b)
+            R=self._G[:p,:p] #type:ignore
+            z=self._G[:p,p] #type:ignore
+            SSres=swyy-2*b@(R.T@z)+np.sum((R@b)**2)
+        else:
+            SSres=swyy-2*b@self._b+b@self._G@b
+        return 1-SSres/(swyy-swy**2/sw)
+
+    @cached_property
+    def adjRsq(self) -> number:
+        """The r^2 value adjusted for the number of features."""
+        return 1-(1-self.rsq)*(self.rows-1)/(self.rows-self.features-1)
+
+
+def _weightedFit(u:NDArray,v:NDArray,W:NDArray,deg:int,ty:str,robust:tuple[str,float]|None=None,maxIter:int=100,tol:float=1e-9) -> tuple[NDArray,NDArray]:
+    """Fits for every row of point weights W (m,n), coefficients in solArray order and f(x) predictions,
+    robust fits by IRLS on the point weights times the loss weights as in Reg._irls FOR INTERNAL USE ONLY"""
+    P=np.vander(u,2*deg+1,increasing=True)
+    fit=lambda W:_stackSolve(W@P,(W*v)@P[:,:deg+1],deg)
+    def model(coef):
+        pred=0.
+        for c in coef.T:
+            pred=pred*u+c[:,None]
+        return pred
+    coef=fit(W)
+    if robust is not None:
+        loss,c=robust
+        for step in (("huber",1.345),("tukey",c)) if loss=="tukey" else (("huber",c),):
+            for _ in range(maxIter):
+                cn=fit(W*Reg._lossWeights(v-model(coef),*step,W))
+                d=np.abs(cn-coef).max(axis=1)
+                done=not (d>tol*(np.abs(coef).max(axis=1)+tol)).any() #Singular (NaN) fits count as done
+                coef=cn
+                if done:
+                    break
+    pred=model(coef)
+    return coef,(np.exp(pred) if ty=="logy" else pred)
+
+def _nlFits(cls:type["Reg"],x:NDArray,fx:NDArray,idx:list[NDArray]) -> tuple[NDArray,NDArray]:
+    """Refit a nonlinear model on every index set, coefficients and f(x) predictions at x FOR INTERNAL USE ONLY"""
+    coef=[]
+    pred=[]
+    for i in idx:
+        r=cls(x[i].tolist(),fx[i].tolist())
+        coef.append(r.solArray)
+        pred.append(r._model(x,r.solArray))
+    return np.array(coef),np.array(pred)
+
+def _bootBatch(cls:type["Reg"],spec:tuple[int,str,str],robust:tuple[str,float]|None,x:NDArray,fx:NDArray,size:int,seed:np.random.SeedSequence) -> tuple[NDArray,NDArray]:
+    """Coefficients and r^2 of size bootstrap replicates drawn from one RNG stream FOR INTERNAL USE ONLY"""
+    rng=np.random.default_rng(seed)
+    n=len(x)
+    idx=rng.integers(0,n,(size,n))
+    W=np.bincount((idx+n*np.arange(size)[:,None]).ravel(),minlength=size*n).reshape(size,n).astype(np.float64)
+    with np.errstate(all="ignore"):
+        if issubclass(cls,NLReg):
+            coef,pred=_nlFits(cls,x,fx,list(idx))
+        else:
+            deg,tx,ty=spec
+            coef,pred=_weightedFit(np.log(x) if tx=="logx" else x,np.log(fx) if ty=="logy" else fx,W,deg,ty,robust)
+        e=fx-pred
+        rsq=1-(W*e*e).sum(axis=1)/(W@(fx*fx)-(W@fx)**2/n)
+    return coef,rsq
+
+def bootstrap(reg:"Reg",n:int=1000,conf:float=0.95,batch:int=256,workers:int=0,seed:int|None=None) -> tuple[NDArray,NDArray]:
+    """Percentile bootstrap confidence intervals of the coefficients and r^2 of a regression.
+
+    Replicates are drawn in batches as point weights, and every fit in a batch comes from its
+    weighted power sums in one stacked solve (NLReg models are refitted one by one).
+    Robust models are refitted by IRLS on every replicate, each iteration again one stacked solve.
+    Each batch has its own RNG stream spawned from seed, so the result does not depend on workers.
+
+    Args:
+        reg (Reg): The fitted regression object, of the model to resample. Needs the stored data.
+        n (int, optional): The number of replicates. Defaults to 1000.
+        conf (float, optional): The confidence level. Defaults to 0.95.
+        batch (int, optional): Replicates per batch, capped so a batch holds about 16M weights. Defaults to 256.
+        workers (int, optional): Run the batches in a process pool of this size, 0 to run in turn. Defaults to 0.
+        seed (int|None, optional): Seed for reproducible replicates. Defaults to None.
+
+    Returns:
+        tuple[NDArray,NDArray]: Lower and upper bounds (2,len(solArray)) of the coefficients in solArray order,
+            and (2,) of r^2. Singular replicates are ignored.
+    """
+    cls=type(reg)
+    if reg._online is not None:
+        raise ValueError("Online regression does not store the data")
+    x=np.asarray(reg.x,dtype=np.float64)
+    fx=np.asarray(reg.fx,dtype=np.float64)
+    size=max(1,min(batch,(1<<24)//len(x)))
+    sizes=[size]*(n//size)+([n%size] if n%size else [])
+    seeds=np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(workers) as ex:
+            out=list(ex.map(_bootBatch,[cls]*len(sizes),[reg._spec]*len(sizes),[reg._robust]*len(sizes),[x]*len(sizes),[fx]*len(sizes),sizes,seeds))
+    else:
+        out=[_bootBatch(cls,reg._spec,reg._robust,x,fx,m,s) for m,s in zip(sizes,seeds)]
+    coef=np.concatenate([c for c,_ in out])
+    rsq=np.concatenate([r for _,r in out])
+    q=[50*(1-conf),50*(1+conf)]
+    return np.nanpercentile(coef,q,axis=0),np.nanpercentile(rsq,q)
+
+def crossVal(reg:"Reg",k:int=5,seed:int|None=None) -> number:
+    """k-fold cross-validation error of a regression.
+
+    Every training fit comes from weighted power sums in one stacked solve (NLReg models are refitted one by one),
+    robust models by IRLS where each iteration is again one stacked solve.
+
+    Args:
+        reg (Reg): The regression object, of the model to validate. Needs the stored data.
+        k (int, optional): The number of folds. Defaults to 5.
+        seed (int|None, optional): Seed of the random fold assignment. Defaults to None.
+
+    Returns:
+        number: Mean square error of the held-out f(x) predictions.
+    """
+    cls=type(reg)
+    if reg._online is not None:
+        raise ValueError("Online regression does not store the data")
+    x=np.asarray(reg.x,dtype=np.float64)
+    fx=np.asarray(reg.fx,dtype=np.float64)
+    fold=np.empty(len(x),dtype=np.intp)
+    fold[np.random.default_rng(seed).permutation(len(x))]=np.arange(len(x))%k
+    held=fold==np.arange(k)[:,None]
+    with np.errstate(all="ignore"):
+        if issubclass(cls,NLReg):
+            _,pred=_nlFits(cls,x,fx,[~h for h in held])
+        else:
+            deg,tx,ty=reg._spec
+            _,pred=_weightedFit(np.log(x) if tx=="logx" else x,np.log(fx) if ty=="logy" else fx,(~held).astype(np.float64),deg,ty,reg._robust)
+    return float(((fx-pred)**2)[held].sum()/len(x))
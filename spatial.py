@@ -0,0 +1,497 @@
+import heapq
+from itertools import count
+from math import inf, sqrt
+from typing import Iterable, Literal
+
+import numpy as np
+
+from .geometry import line, plane
+from .typedef import NDArray
+from .vec import v3d
+
+Kind = Literal["point", "line", "plane"]
+_LEAF = 8
+
+
+def _vec(p: v3d | list[float] | NDArray) -> NDArray:
+    """Point as float array FOR INTERNAL USE ONLY"""
+    if isinstance(p, v3d):
+        return np.array(p.rec3d(), dtype=np.float64)
+    return np.asarray(p, dtype=np.float64).reshape(3)
+
+
+def _clip(a: NDArray, d: NDArray, lo: NDArray, hi: NDArray, t0: float = -inf, t1: float = inf) -> tuple[float, float] | None:
+    """Parameter range of a+t*d inside box lo..hi (slab method) FOR INTERNAL USE ONLY"""
+    for k in range(3):
+        if d[k] == 0:
+            if a[k] < lo[k] or a[k] > hi[k]:
+                return None
+            continue
+        u = (lo[k]-a[k])/d[k]
+        v = (hi[k]-a[k])/d[k]
+        if u > v:
+            u, v = v, u
+        t0 = max(t0, u)
+        t1 = min(t1, v)
+        if t0 > t1:
+            return None
+    return t0, t1
+
+
+def _corners(lo: NDArray, hi: NDArray) -> NDArray:
+    """8 corners of box lo..hi FOR INTERNAL USE ONLY"""
+    return np.array([[(lo, hi)[i][0], (lo, hi)[j][1], (lo, hi)[k][2]] for i in (0, 1) for j in (0, 1) for k in (0, 1)])
+
+
+def _clipPlane(n: NDArray, e: float, lo: NDArray, hi: NDArray) -> NDArray | None:
+    """Convex polygon of plane n.x+e=0 inside box lo..hi, ordered around n FOR INTERNAL USE ONLY"""
+    c = _corners(lo, hi)
+    sd = c@n+e
+    pts = [c[i] for i in range(8) if sd[i] == 0]
+    for i in range(8):
+        for j in range(i+1, 8):
+            #Box edges join corners differing in exactly one axis
+            if bin(i ^ j).count("1") == 1 and sd[i]*sd[j] < 0:
+                pts.append(c[i]+(c[j]-c[i])*sd[i]/(sd[i]-sd[j]))
+    if not pts:
+        return None
+    poly = np.unique(np.round(np.array(pts), 12), axis=0)
+    if len(poly) < 3:
+        return poly
+    u = poly[0]-poly.mean(axis=0)
+    if not u.any():
+        u = poly[1]-poly.mean(axis=0)
+    u = u/np.linalg.norm(u)
+    v = np.cross(n, u)
+    r = poly-poly.mean(axis=0)
+    return poly[np.argsort(np.arctan2(r@v, r@u))]
+
+
+def _pointSeg(p: NDArray, a: NDArray, b: NDArray) -> tuple[float, float]:
+    """Distance from p to segment a..b and the segment parameter FOR INTERNAL USE ONLY"""
+    d = b-a
+    dd = d@d
+    t = 0. if dd == 0 else min(max((p-a)@d/dd, 0.), 1.)
+    return float(np.linalg.norm(a+d*t-p)), t
+
+
+def _segSeg(p1: NDArray, q1: NDArray, p2: NDArray, q2: NDArray) -> tuple[float, float]:
+    """Distance between segments p1..q1 and p2..q2 and the parameter on the first FOR INTERNAL USE ONLY"""
+    d1 = q1-p1
+    d2 = q2-p2
+    r = p1-p2
+    a = d1@d1
+    e = d2@d2
+    f = d2@r
+    if a == 0:
+        return _pointSeg(p1, p2, q2)[0], 0.
+    c = d1@r
+    if e == 0:
+        s = min(max(-c/a, 0.), 1.)
+        return float(np.linalg.norm(p1+d1*s-p2)), s
+    b = d1@d2
+    den = a*e-b*b
+    s = min(max((b*f-c*e)/den, 0.), 1.) if den > 0 else 0.
+    t = (b*s+f)/e
+    if t < 0:
+        t = 0.
+        s = min(max(-c/a, 0.), 1.)
+    elif t > 1:
+        t = 1.
+        s = min(max((b-c)/a, 0.), 1.)
+    return float(np.linalg.norm(p1+d1*s-p2-d2*t)), s
+
+
+def _pointPoly(p: NDArray, n: NDArray, e: float, poly: NDArray) -> float:
+    """Distance from p to convex polygon poly lying on plane n.x+e=0 FOR INTERNAL USE ONLY"""
+    if len(poly) == 1:
+        return float(np.linalg.norm(poly[0]-p))
+    if len(poly) == 2:
+        return _pointSeg(p, poly[0], poly[1])[0]
+    sd = p@n+e
+    q = p-n*sd
+    edge = np.roll(poly, -1, axis=0)-poly
+    if (np.cross(edge, q-poly)@n >= -1e-12).all():
+        return abs(float(sd))
+    return min(_pointSeg(p, poly[i], poly[(i+1) % len(poly)])[0] for i in range(len(poly)))
+
+
+class _BVH:
+    """Static bounding volume hierarchy over item boxes FOR INTERNAL USE ONLY"""
+
+    def __init__(self, ids: list[int], lo: NDArray, hi: NDArray):
+        self.ids = np.array(ids, dtype=np.int64)
+        cen = (lo+hi)/2
+        nlo: list[NDArray] = []
+        nhi: list[NDArray] = []
+        self.child: list[tuple[int, int]] = []
+        self.span: list[tuple[int, int]] = []
+        order = np.arange(len(ids))
+        stack = [(0, len(ids), -1, 0)]
+        while stack:
+            s, t, parent, side = stack.pop()
+            node = len(self.child)
+            if parent >= 0:
+                c = list(self.child[parent])
+                c[side] = node
+                self.child[parent] = (c[0], c[1])
+            idx = order[s:t]
+            nlo.append(lo[idx].min(axis=0))
+            nhi.append(hi[idx].max(axis=0))
+            self.child.append((-1, -1))
+            self.span.append((s, t))
+            if t-s > _LEAF:
+                #Median split on the widest axis of the centroids
+                axis = int(np.argmax(np.ptp(cen[idx], axis=0)))
+                m = (t-s)//2
+                order[s:t] = idx[np.argpartition(cen[idx, axis], m)]
+                stack.append((s+m, t, node, 1))
+                stack.append((s, s+m, node, 0))
+        self.ids = self.ids[order]
+        self.lo = np.array(nlo)
+        self.hi = np.array(nhi)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class SpatialIndex:
+    """Spatial index over points, lines and planes inside a finite scene
+
+    Lines and planes are clipped to the scene bounds and indexed by the box of
+    the clipped piece, so every distance is measured to the part inside the scene.
+    Insertions go to a stack of static trees of doubling size (logarithmic method)
+    and deletions are lazy, so updates are amortized O(log^2 n) and queries
+    visit O(log n) trees of logarithmic depth.
+    """
+    lo: NDArray #Scene lower corner
+    hi: NDArray #Scene upper corner
+
+    def __repr__(self):
+        return f'SpatialIndex({len(self)} items in {list(self.lo)}..{list(self.hi)})'
+
+    def __init__(self, lo: v3d | list[float], hi: v3d | list[float]):
+        """Spatial index over points, lines and planes
+
+        Args:
+            lo (v3d | list[float]): Lower corner of the scene
+            hi (v3d | list[float]): Upper corner of the scene
+
+        Examples:
+            >>> s = SpatialIndex([0,0,0],[10,10,10])
+            >>> i = s.insert(line([0,5,5],[1,0,0]))
+            >>> j = s.insert(plane([0,0,2],[0,0,1]))
+            >>> s.nearest([3,5,4])
+            [(0, 1.0)]
+            >>> s.ray([3,3,9],[0,0,-1])
+            [(1, 7.0)]
+        """
+        self.lo = _vec(lo)
+        self.hi = _vec(hi)
+        self._items: dict[int, tuple[Kind, object, tuple]] = {}
+        self._box: dict[int, tuple[NDArray, NDArray]] = {}
+        self._trees: list[_BVH | None] = []
+        self._dead = 0
+        self._count = count()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, id: int) -> object:
+        """Object inserted under id"""
+        return self._items[id][1]
+
+    def __contains__(self, id: int) -> bool:
+        return id in self._items
+
+    def _geom(self, obj: object) -> tuple[Kind, tuple, NDArray, NDArray]:
+        """Clip obj to the scene FOR INTERNAL USE ONLY"""
+        if isinstance(obj, line):
+            a = _vec(obj.a)
+            d = _vec(obj.d)
+            t = _clip(a, d, self.lo, self.hi)
+            if t is None:
+                raise ValueError("Line does not cross the scene bounds")
+            s = (a+d*t[0], a+d*t[1])
+            return "line", s, np.minimum(*s), np.maximum(*s)
+        if isinstance(obj, plane):
+            n = _vec(obj.n)
+            e = float(obj.eqd)
+            poly = _clipPlane(n, e, self.lo, self.hi)
+            if poly is None:
+                raise ValueError("Plane does not cross the scene bounds")
+            return "plane", (n, e, poly), poly.min(axis=0), poly.max(axis=0)
+        p = _vec(obj)  # type: ignore
+        if (p < self.lo).any() or (p > self.hi).any():
+            raise ValueError("Point is outside the scene bounds")
+        return "point", (p,), p, p
+
+    def insert(self, obj: line | plane | v3d | list[float]) -> int:
+        """Insert a line, plane or point
+
+        Args:
+            obj (line | plane | v3d | list[float]): Object to insert
+
+        Returns:
+            int: id of the object
+
+        Raises:
+            ValueError: If the object misses the scene bounds
+        """
+        return self.extend([obj])[0]
+
+    def extend(self, objs: Iterable[line | plane | v3d | list[float]] | NDArray) -> list[int]:
+        """Insert many lines, planes or points, (n,3) arrays are taken as points
+
+        Args:
+            objs (Iterable[line | plane | v3d | list[float]] | NDArray): Objects to insert
+
+        Returns:
+            list[int]: ids of the objects in order
+
+        Raises:
+            ValueError: If an object misses the scene bounds, nothing is inserted then
+        """
+        objs = list(objs)
+        geoms = [self._geom(obj) for obj in objs] #All checked before any is stored
+        ids = []
+        for obj, (kind, geom, lo, hi) in zip(objs, geoms):
+            i = next(self._count)
+            self._items[i] = (kind, obj, geom)
+            self._box[i] = (lo, hi)
+            ids.append(i)
+        if ids:
+            self._push(ids)
+        return ids
+
+    def _push(self, ids: list[int]):
+        """Merge ids into the tree stack like a binary counter FOR INTERNAL USE ONLY"""
+        k = 0
+        while k < len(self._trees) and (self._trees[k] is not None or (1 << k) < len(ids)):
+            t = self._trees[k]
+            if t is not None:
+                live = [i for i in t.ids.tolist() if i in self._items]
+                self._dead -= len(t.ids)-len(live) #Tombstones dropped by the rebuild
+                ids = ids+live
+                self._trees[k] = None
+            k += 1
+        while len(self._trees) <= k:
+            self._trees.append(None)
+        self._trees[k] = self._build(ids)
+
+    def _build(self, ids: list[int]) -> _BVH:
+        """Build a tree over ids FOR INTERNAL USE ONLY"""
+        return _BVH(ids, np.array([self._box[i][0] for i in ids]), np.array([self._box[i][1] for i in ids]))
+
+    def remove(self, id: int) -> object:
+        """Remove an object
+
+        Args:
+            id (int): id of the object
+
+        Returns:
+            object: The removed object
+
+        Raises:
+            KeyError: If id is not in the index
+        """
+        obj = self._items.pop(id)[1]
+        del self._box[id]
+        self._dead += 1
+        if self._dead > len(self._items):
+            ids = list(self._items)
+            self._trees = []
+            self._dead = 0
+            if ids:
+                self._push(ids)
+        return obj
+
+    def _dist(self, id: int, p: NDArray) -> float:
+        """Distance from p to the clipped object FOR INTERNAL USE ONLY"""
+        kind, _, g = self._items[id]
+        if kind == "point":
+            return float(np.linalg.norm(g[0]-p))
+        if kind == "line":
+            return _pointSeg(p, g[0], g[1])[0]
+        return _pointPoly(p, *g)
+
+    def nearest(self, p: v3d | list[float], k: int = 1, kind: Kind | None = None) -> list[tuple[int, float]]:
+        """k nearest objects to a point
+
+        Args:
+            p (v3d | list[float]): Point
+            k (int, optional): Number of objects. Defaults to 1.
+            kind (Kind | None, optional): Only "point", "line" or "plane". Defaults to all.
+
+        Returns:
+            list[tuple[int, float]]: (id, distance) sorted by distance
+        """
+        p = _vec(p)
+        tie = count()
+        heap: list[tuple[float, int, _BVH, int]] = []
+        best: list[tuple[float, int]] = [] #max-heap of (-dist, id)
+        for t in self._trees:
+            if t is not None:
+                heapq.heappush(heap, (self._boxDist(t, 0, p), next(tie), t, 0))
+        while heap:
+            d, _, t, node = heapq.heappop(heap)
+            if len(best) == k and d > -best[0][0]:
+                break
+            left, right = t.child[node]
+            if left < 0:
+                s, e = t.span[node]
+                for i in t.ids[s:e].tolist():
+                    if i not in self._items or (kind and self._items[i][0] != kind):
+                        continue
+                    di = self._dist(i, p)
+                    if len(best) < k:
+                        heapq.heappush(best, (-di, i))
+                    elif di < -best[0][0]:
+                        heapq.heapreplace(best, (-di, i))
+            else:
+                for c in (left, right):
+                    heapq.heappush(heap, (self._boxDist(t, c, p), next(tie), t, c))
+        return sorted(((i, -d) for d, i in best), key=lambda x: x[1])
+
+    def radius(self, p: v3d | list[float], r: float, kind: Kind | None = None) -> list[tuple[int, float]]:
+        """All objects within distance r of a point
+
+        Args:
+            p (v3d | list[float]): Point
+            r (float): Radius
+            kind (Kind | None, optional): Only "point", "line" or "plane". Defaults to all.
+
+        Returns:
+            list[tuple[int, float]]: (id, distance) sorted by distance
+        """
+        p = _vec(p)
+        out = []
+        for t in self._trees:
+            if t is None:
+                continue
+            stack = [0]
+            while stack:
+                node = stack.pop()
+                if self._boxDist(t, node, p) > r:
+                    continue
+                left, right = t.child[node]
+                if left >= 0:
+                    stack += [left, right]
+                    continue
+                s, e = t.span[node]
+                for i in t.ids[s:e].tolist():
+                    if i not in self._items or (kind and self._items[i][0] != kind):
+                        continue
+                    di = self._dist(i, p)
+                    if di <= r:
+                        out.append((i, di))
+        return sorted(out, key=lambda x: x[1])
+
+    def box(self, lo: v3d | list[float], hi: v3d | list[float], kind: Kind | None = None) -> list[int]:
+        """All objects intersecting an axis aligned box
+
+        Args:
+            lo (v3d | list[float]): Lower corner
+            hi (v3d | list[float]): Upper corner
+            kind (Kind | None, optional): Only "point", "line" or "plane". Defaults to all.
+
+        Returns:
+            list[int]: ids in no particular order
+        """
+        lo = np.maximum(_vec(lo), self.lo)
+        hi = np.minimum(_vec(hi), self.hi)
+        if (lo > hi).any():
+            return []
+        sd = _corners(lo, hi)
+        out = []
+        for t in self._trees:
+            if t is None:
+                continue
+            stack = [0]
+            while stack:
+                node = stack.pop()
+                if (t.lo[node] > hi).any() or (t.hi[node] < lo).any():
+                    continue
+                left, right = t.child[node]
+                if left >= 0:
+                    stack += [left, right]
+                    continue
+                s, e = t.span[node]
+                for i in t.ids[s:e].tolist():
+                    if i not in self._items or (kind and self._items[i][0] != kind):
+                        continue
+                    k, _, g = self._items[i]
+                    if k == "point":
+                        hit = not ((g[0] < lo).any() or (g[0] > hi).any())
+                    elif k == "line":
+                        hit = _clip(g[0], g[1]-g[0], lo, hi, 0., 1.) is not None
+                    else:
+                        c = sd@g[0]+g[1]
+                        hit = c.min() <= 0 <= c.max()
+                    if hit:
+                        out.append(i)
+        return out
+
+    def ray(self, o: v3d | list[float], d: v3d | list[float], r: float = 0, tmax: float = inf, kind: Kind | None = None) -> list[tuple[int, float]]:
+        """All objects hit by a ray
+
+        Points and lines are hit when they come within r of the ray,
+        planes when the ray crosses them or comes within r.
+
+        Args:
+            o (v3d | list[float]): Ray origin
+            d (v3d | list[float]): Ray direction
+            r (float, optional): Hit tolerance. Defaults to 0.
+            tmax (float, optional): Ray length. Defaults to inf.
+            kind (Kind | None, optional): Only "point", "line" or "plane". Defaults to all.
+
+        Returns:
+            list[tuple[int, float]]: (id, distance along the ray) sorted by distance
+        """
+        o = _vec(o)
+        d = _vec(d)
+        d = d/np.linalg.norm(d)
+        span = _clip(o, d, self.lo, self.hi, 0., tmax)
+        if span is None:
+            return []
+        t0, t1 = span
+        a = o+d*t0
+        b = o+d*t1
+        out = []
+        for t in self._trees:
+            if t is None:
+                continue
+            stack = [0]
+            while stack:
+                node = stack.pop()
+                if _clip(o, d, t.lo[node]-r, t.hi[node]+r, t0, t1) is None:
+                    continue
+                left, right = t.child[node]
+                if left >= 0:
+                    stack += [left, right]
+                    continue
+                s, e = t.span[node]
+                for i in t.ids[s:e].tolist():
+                    if i not in self._items or (kind and self._items[i][0] != kind):
+                        continue
+                    k, _, g = self._items[i]
+                    if k == "point":
+                        di, u = _pointSeg(g[0], a, b)
+                    elif k == "line":
+                        di, u = _segSeg(a, b, g[0], g[1])
+                    else:
+                        sa = a@g[0]+g[1]
+                        sb = b@g[0]+g[1]
+                        if sa*sb <= 0:
+                            di, u = 0., (sa/(sa-sb) if sa != sb else 0.)
+                        else:
+                            di, u = (abs(sa), 0.) if abs(sa) < abs(sb) else (abs(sb), 1.)
+                    if di <= r:
+                        out.append((i, float(t0+(t1-t0)*u)))
+        return sorted(out, key=lambda x: x[1])
+
+    @staticmethod
+    def _boxDist(t: _BVH, node: int, p: NDArray) -> float:
+        """Distance from p to a node box FOR INTERNAL USE ONLY"""
+        g = np.maximum(np.maximum(t.lo[node]-p, p-t.hi[node]), 0)
+        return sqrt(g@g)
@@ -24,7 +24,9 @@ def lapprox(p1:tuple[number,number],p2:tuple[number,number],x:number)->float:
         x (number): x value of line
         
     Returns:
-        float: y value of line"""
+        float: y value of line
+
+    See Interp for tables of many points"""
     return (p2[0]-p1[0])/(p2[1]-p1[1])*(x-p1[1])+p1[0]
 
 def percentile(x: list[number], p: number):
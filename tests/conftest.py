@@ -0,0 +1,14 @@
+import importlib
+import pathlib
+import sys
+
+import pytest
+
+_root = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_root.parent))
+
+
+@pytest.fixture(scope="session")
+def mx():
+    """The package under test, imported by its directory name"""
+    return importlib.import_module(_root.name)
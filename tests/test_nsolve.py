@@ -0,0 +1,12 @@
+import numpy as np
+import pytest
+
+
+def test_fdjac_groups_need_pattern(mx):
+    f = lambda t, y: -y
+    pattern = np.identity(4, dtype=bool)
+    groups = mx.colGroups(pattern)
+    J, _ = mx.fdJac(f, 0, np.ones(4), groups=groups, pattern=pattern)
+    np.testing.assert_allclose(J, -np.identity(4), atol=1e-6)
+    with pytest.raises(ValueError):
+        mx.fdJac(f, 0, np.ones(4), groups=groups)
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize("lo,hi,deg", [(1000, 1010, 6), (1000, 1010, 10), (0, 1000, 20)])
+def test_poly_pred_interval_high_degree_offset_x(mx, lo, hi, deg):
+    rng = np.random.default_rng(0)
+    x = np.linspace(lo, hi, 200)
+    y = np.sin((x-lo)/(hi-lo)*6)+rng.normal(0, 0.01, 200)
+    r = mx.PolyReg(x.tolist(), y.tolist(), degree=deg)
+    l, h = r.predInterval(x)
+    fx = r.f(x)
+    assert np.isfinite(l).all() and np.isfinite(h).all()
+    assert ((l < fx) & (fx < h)).all()
+
+
+def test_poly_pred_interval_matches_quadratic(mx):
+    rng = np.random.default_rng(1)
+    x = np.linspace(0, 1, 50)
+    y = 1+2*x+rng.normal(0, 0.1, 50)
+    a = mx.PolyReg(x.tolist(), y.tolist(), degree=2).predInterval([0.3, 2])
+    b = mx.QuadReg(x.tolist(), y.tolist()).predInterval([0.3, 2])
+    np.testing.assert_allclose(a, b)
+
+
+def test_nl_constructors_keep_the_nonlinear_model(mx, tmp_path):
+    x = np.linspace(1, 5, 50)
+    np.savetxt(tmp_path/"d.csv", np.c_[x, 3*np.exp(0.5*x)], delimiter=",", header="x,y", comments="")
+    r = mx.ExpNLReg.fromFile(str(tmp_path/"d.csv"), chunk=7)
+    assert type(r) is mx.ExpNLReg
+    np.testing.assert_allclose(r.solArray, [3, 0.5])
+    with pytest.raises(TypeError):
+        mx.PowNLReg.online()
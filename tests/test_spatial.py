@@ -0,0 +1,13 @@
+import numpy as np
+import pytest
+
+
+def test_failed_extend_leaves_index_unchanged(mx):
+    rng = np.random.default_rng(0)
+    s = mx.SpatialIndex([0, 0, 0], [10, 10, 10])
+    s.extend(rng.uniform(0, 10, (430, 3)))
+    before = (len(s), s.nearest([5, 5, 5], 5), s.box([2, 2, 2], [6, 6, 6]))
+    with pytest.raises(ValueError):
+        s.extend([[5, 5, 5], mx.line([20, 20, 20], [1, 0, 0])])
+    assert (len(s), s.nearest([5, 5, 5], 5), s.box([2, 2, 2], [6, 6, 6])) == before
+    assert s.insert([1, 1, 1]) == 430